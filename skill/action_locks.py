@@ -0,0 +1,120 @@
+import asyncio
+from collections import deque
+from typing import Any, Deque, Dict, FrozenSet, Optional, Tuple
+
+ECONOMY_ACTIONS = ("apply_job", "buy_property", "vote_job")
+MOVEMENT_ACTIONS = ("move_to", "enter_building")
+EVENT_ACTIONS = ("create_event", "join_event")
+
+
+def action_resources(action: Dict[str, Any]) -> FrozenSet[str]:
+    """Resources an action touches; actions sharing none of them may run at the same time."""
+    action_type = str(action.get("type") or "")
+    params = action.get("params") if isinstance(action.get("params"), dict) else {}
+    if action_type in MOVEMENT_ACTIONS:
+        return frozenset(("movement",))
+    if action_type in ECONOMY_ACTIONS:
+        return frozenset(("economy",))
+    if action_type in EVENT_ACTIONS:
+        return frozenset(("events",))
+    if action_type in ("conversation_message", "end_conversation"):
+        return frozenset((f"conversation:{params.get('conversation_id')}",))
+    if action_type == "start_conversation":
+        return frozenset((f"conversation:with:{params.get('target_id')}",))
+    if action_type == "speak":
+        return frozenset(("speech",))
+    if action_type.startswith("coord_"):
+        return frozenset((f"coordination:{params.get('proposal_id') or 'new'}",))
+    return frozenset((f"action:{action_type}",))
+
+
+class ResourceLocks:
+    """Exclusive locks over named resources with a global concurrency limit and FIFO fairness.
+
+    A waiter is granted once none of its resources is held, a slot is free and no earlier
+    waiter that is still blocked needs any of them, so later requests never starve earlier ones.
+    """
+
+    def __init__(self, max_concurrent: int = 3):
+        self.max_concurrent = max(1, int(max_concurrent))
+        self._held: set = set()
+        self._active = 0
+        self._waiters: Deque[Tuple[FrozenSet[str], asyncio.Future]] = deque()
+        self.metrics: Dict[str, Any] = {
+            "granted": 0,
+            "waited": 0,
+            "timeouts": 0,
+            "maxActive": 0,
+            "waitMsMax": 0.0,
+            "lastWaitMs": 0.0
+        }
+
+    def _now_ms(self) -> float:
+        return asyncio.get_event_loop().time() * 1000
+
+    def _free(self, resources: FrozenSet[str]) -> bool:
+        return self._held.isdisjoint(resources)
+
+    def _take(self, resources: FrozenSet[str]) -> None:
+        self._held |= resources
+        self._active += 1
+        self.metrics["maxActive"] = max(int(self.metrics.get("maxActive", 0)), self._active)
+
+    def _wake(self) -> None:
+        blocked: set = set()
+        for item in list(self._waiters):
+            resources, future = item
+            if future.done():
+                self._waiters.remove(item)
+                continue
+            if self._active >= self.max_concurrent:
+                break
+            if self._free(resources) and not (resources & blocked):
+                self._waiters.remove(item)
+                self._take(resources)
+                future.set_result(True)
+            else:
+                blocked |= resources
+
+    async def acquire(self, resources: FrozenSet[str], timeout: Optional[float] = None) -> bool:
+        """Hold every resource in ``resources``; False if that did not happen within ``timeout``."""
+        started_ms = self._now_ms()
+        if not self._waiters and self._active < self.max_concurrent and self._free(resources):
+            self._take(resources)
+            self.metrics["granted"] += 1
+            return True
+        future: asyncio.Future = asyncio.get_event_loop().create_future()
+        self._waiters.append((resources, future))
+        self.metrics["waited"] += 1
+        self._wake()
+        try:
+            await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError:
+            self.metrics["timeouts"] += 1
+            self._wake()
+            return False
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Resources were handed over just before the caller went away.
+                self.release(resources)
+            else:
+                self._wake()
+            raise
+        wait_ms = round(self._now_ms() - started_ms, 3)
+        self.metrics["granted"] += 1
+        self.metrics["lastWaitMs"] = wait_ms
+        self.metrics["waitMsMax"] = max(float(self.metrics.get("waitMsMax", 0.0)), wait_ms)
+        return True
+
+    def release(self, resources: FrozenSet[str]) -> None:
+        self._held -= resources
+        self._active = max(0, self._active - 1)
+        self._wake()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **self.metrics,
+            "active": self._active,
+            "held": sorted(self._held),
+            "waiting": sum(1 for _, future in self._waiters if not future.done())
+        }
@@ -0,0 +1,211 @@
+import asyncio
+import itertools
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+# Actions sent as fire-and-forget socket emits; their outcome is only known from later events.
+EMITTED_ACTIONS = ("move_to", "enter_building", "speak")
+SINGLE_FLIGHT_ACTIONS = ("move_to", "enter_building")
+# Starts of the server ``error`` messages that only the handler of one emitted action sends
+# (agent:moveTo, agent:speak, agent:action). Anything else, e.g. auth or session errors, is
+# not blamed on a pending action.
+ERROR_HINTS = (
+    ("move rate limit", "move_to"),
+    ("invalid move target", "move_to"),
+    ("speak rate limit", "speak"),
+    ("message required", "speak"),
+    ("action rate limit", "enter_building"),
+    ("actiontype is required", "enter_building")
+)
+MAX_REASONS = 12
+LATENCY_WINDOW = 64
+
+
+def perceived_effect(action_type: str, params: Dict[str, Any], perception: Dict[str, Any]) -> Optional[bool]:
+    """Whether ``perception`` shows the effect of an action; None when it cannot tell."""
+    if not isinstance(perception, dict):
+        return None
+    if action_type == "move_to":
+        pos = perception.get("position", {}) or {}
+        tx, ty = params.get("x"), params.get("y")
+        if isinstance(tx, (int, float)) and isinstance(ty, (int, float)):
+            if isinstance(pos.get("x"), (int, float)) and isinstance(pos.get("y"), (int, float)):
+                return abs(pos.get("x") - tx) <= 2 and abs(pos.get("y") - ty) <= 2
+    if action_type == "enter_building":
+        current = perception.get("currentBuilding") or {}
+        return current.get("id") == params.get("building_id")
+    if action_type == "start_conversation":
+        convs = perception.get("conversations", []) or []
+        return any(params.get("target_id") in (c.get("participants") or []) for c in convs)
+    return None
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class ActionTracker:
+    """Tags executed actions with ids and correlates them with their observed outcome.
+
+    REST actions resolve from their response. Emitted actions stay pending until a perception
+    shows their effect, the server echoes or rejects them, or ``confirm_timeout_sec`` passes.
+    Latency is measured from the decision that produced the action to its confirmed effect.
+    """
+
+    def __init__(
+        self,
+        confirm_timeout_sec: float = 45.0,
+        max_pending: int = 32,
+        on_outcome: Optional[Callable[[Dict[str, Any]], None]] = None
+    ):
+        self.confirm_timeout_sec = max(1.0, float(confirm_timeout_sec))
+        self.on_outcome = on_outcome
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._max_pending = max(1, int(max_pending))
+        self._ids = itertools.count(1)
+        self._outcomes: Dict[str, Dict[str, Any]] = {}
+        self._confirmed_at: Deque[float] = deque(maxlen=256)
+        self._latencies: Dict[str, Deque[float]] = {}
+        self.metrics: Dict[str, Any] = {
+            "started": 0, "confirmed": 0, "failed": 0, "timedOut": 0, "unattributedErrors": 0, "byType": {}
+        }
+
+    def _now(self) -> float:
+        return asyncio.get_event_loop().time()
+
+    def _type_metrics(self, action_type: str) -> Dict[str, Any]:
+        by_type = self.metrics.setdefault("byType", {})
+        entry = by_type.get(action_type)
+        if entry is None:
+            entry = {"started": 0, "confirmed": 0, "failed": 0, "latencyMsAvg": 0.0, "latencyMsMax": 0.0,
+                     "effectMsAvg": 0.0, "failures": {}}
+            by_type[action_type] = entry
+        return entry
+
+    def start(self, action_type: str, params: Dict[str, Any], decided_at: Optional[float] = None) -> str:
+        """Register an action about to be executed and return its id."""
+        now = self._now()
+        if action_type in SINGLE_FLIGHT_ACTIONS:
+            # A new destination replaces the old one, which will never be reached now.
+            previous = self._oldest_pending(action_type)
+            if previous is not None:
+                self._finish(previous, False, "superseded")
+        action_id = f"act-{next(self._ids)}"
+        self._pending[action_id] = {
+            "id": action_id,
+            "type": action_type,
+            "params": params,
+            "decidedAt": decided_at if decided_at is not None else now,
+            "startedAt": now
+        }
+        if len(self._pending) > self._max_pending:
+            oldest = min(self._pending.values(), key=lambda entry: entry["startedAt"])
+            self._finish(oldest, False, "evicted")
+        self.metrics["started"] += 1
+        self._type_metrics(action_type)["started"] += 1
+        return action_id
+
+    def complete(self, action_id: str, result: Any) -> None:
+        """Resolve a REST action from its response; emitted actions wait for confirmation."""
+        entry = self._pending.get(action_id)
+        if entry is None:
+            return
+        error = result.get("error") if isinstance(result, dict) else None
+        if error:
+            self._finish(entry, False, str(error))
+        elif entry["type"] not in EMITTED_ACTIONS:
+            self._finish(entry, True, None)
+
+    def fail(self, action_id: str, reason: str) -> None:
+        entry = self._pending.get(action_id)
+        if entry is not None:
+            self._finish(entry, False, reason)
+
+    def observe(self, perception: Dict[str, Any]) -> None:
+        """Confirm pending emitted actions whose effect shows in ``perception``."""
+        for entry in list(self._pending.values()):
+            if entry["type"] in EMITTED_ACTIONS and perceived_effect(entry["type"], entry["params"], perception):
+                self._finish(entry, True, None)
+        self.expire()
+
+    def confirm_echo(self, action_type: str) -> None:
+        """The server echoed an action of ``action_type`` back; confirm the oldest pending one."""
+        entry = self._oldest_pending(action_type)
+        if entry is not None:
+            self._finish(entry, True, None)
+
+    def reject(self, message: str) -> None:
+        """Fail the pending emitted action a server ``error`` event refers to; other errors are only counted."""
+        text = str(message or "").strip().lower()
+        action_type = next((kind for hint, kind in ERROR_HINTS if text.startswith(hint)), None)
+        entry = self._oldest_pending(action_type) if action_type else None
+        if entry is None:
+            self.metrics["unattributedErrors"] += 1
+            return
+        self._finish(entry, False, str(message))
+
+    def _oldest_pending(self, action_type: Optional[str]) -> Optional[Dict[str, Any]]:
+        candidates = [entry for entry in self._pending.values()
+                      if entry["type"] in EMITTED_ACTIONS and (action_type is None or entry["type"] == action_type)]
+        return min(candidates, key=lambda entry: entry["startedAt"]) if candidates else None
+
+    def expire(self) -> None:
+        cutoff = self._now() - self.confirm_timeout_sec
+        for entry in list(self._pending.values()):
+            if entry["startedAt"] < cutoff:
+                self.metrics["timedOut"] += 1
+                self._finish(entry, False, "unconfirmed")
+
+    def outcome(self, action_id: Optional[str]) -> Optional[bool]:
+        """True/False once ``action_id`` resolved, None while pending or unknown."""
+        record = self._outcomes.get(action_id) if action_id else None
+        return record["ok"] if record else None
+
+    def _finish(self, entry: Dict[str, Any], ok: bool, reason: Optional[str]) -> None:
+        self._pending.pop(entry["id"], None)
+        now = self._now()
+        latency_ms = round((now - entry["decidedAt"]) * 1000, 3)
+        effect_ms = round((now - entry["startedAt"]) * 1000, 3)
+        stats = self._type_metrics(entry["type"])
+        if ok:
+            self.metrics["confirmed"] += 1
+            stats["confirmed"] += 1
+            self._confirmed_at.append(now)
+            count = stats["confirmed"]
+            stats["latencyMsAvg"] = round(stats["latencyMsAvg"] + (latency_ms - stats["latencyMsAvg"]) / count, 3)
+            stats["effectMsAvg"] = round(stats["effectMsAvg"] + (effect_ms - stats["effectMsAvg"]) / count, 3)
+            stats["latencyMsMax"] = max(stats["latencyMsMax"], latency_ms)
+            self._latencies.setdefault(entry["type"], deque(maxlen=LATENCY_WINDOW)).append(latency_ms)
+        else:
+            self.metrics["failed"] += 1
+            stats["failed"] += 1
+            failures = stats["failures"]
+            key = str(reason or "unknown")[:80]
+            if key in failures or len(failures) < MAX_REASONS:
+                failures[key] = failures.get(key, 0) + 1
+        record = {"id": entry["id"], "type": entry["type"], "ok": ok, "reason": reason, "latencyMs": latency_ms}
+        self._outcomes[entry["id"]] = record
+        while len(self._outcomes) > LATENCY_WINDOW:
+            self._outcomes.pop(next(iter(self._outcomes)))
+        if self.on_outcome is not None:
+            self.on_outcome(record)
+
+    def snapshot(self) -> Dict[str, Any]:
+        self.expire()
+        now = self._now()
+        by_type = {}
+        for action_type, stats in self.metrics.get("byType", {}).items():
+            latencies = list(self._latencies.get(action_type, ()))
+            by_type[action_type] = {
+                **stats,
+                "failures": dict(stats["failures"]),
+                "latencyMsP50": _percentile(latencies, 0.5) if latencies else None,
+                "latencyMsP90": _percentile(latencies, 0.9) if latencies else None
+            }
+        return {
+            **self.metrics,
+            "byType": by_type,
+            "pending": len(self._pending),
+            "confirmedLastMin": sum(1 for ts in self._confirmed_at if now - ts <= 60)
+        }
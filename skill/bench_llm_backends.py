@@ -0,0 +1,188 @@
+"""
+Harness for BackendPool against two local stub LLM backends: one slow, one failing.
+
+    python bench_llm_backends.py --slow-ms 600 --hedge-ms 150
+
+Both stubs speak the ollama chat API (``POST /api/chat``, ``GET /api/tags``). The failing stub
+answers 500 while it is broken and instantly once it recovers. Each scenario runs the pool the
+way the skill does and checks least-outstanding selection, failover, health-probe ejection and
+hedging; the process exits non-zero if any check fails.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiohttp
+from aiohttp import web
+
+from llm_backends import BackendPool
+
+
+class StubBackend:
+    """Minimal ollama-like server that is either slow or broken."""
+
+    def __init__(self, name: str, delay_sec: float = 0.0, broken: bool = False):
+        self.name = name
+        self.delay_sec = delay_sec
+        self.broken = broken
+        self.chats = 0
+        self.url = ""
+        self._runner: Optional[web.AppRunner] = None
+
+    async def _chat(self, request: web.Request) -> web.Response:
+        self.chats += 1
+        if self.broken:
+            return web.json_response({"error": "model crashed"}, status=500)
+        await asyncio.sleep(self.delay_sec)
+        return web.json_response({"message": {"role": "assistant", "content": f"hola desde {self.name}"}, "done": True})
+
+    async def _tags(self, request: web.Request) -> web.Response:
+        if self.broken:
+            return web.json_response({"error": "unavailable"}, status=500)
+        return web.json_response({"models": [{"name": "stub"}]})
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_post("/api/chat", self._chat)
+        app.router.add_get("/api/tags", self._tags)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = self._runner.addresses[0][:2]
+        self.url = f"http://{host}:{port}"
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+
+class Harness:
+    def __init__(self, slow: StubBackend, failing: StubBackend):
+        self.slow = slow
+        self.failing = failing
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.failures: List[str] = []
+
+    def names(self) -> Dict[str, str]:
+        return {self.slow.url: self.slow.name, self.failing.url: self.failing.name}
+
+    async def attempt(self, base_url: str) -> Tuple[Optional[str], Dict[str, Any]]:
+        """Same contract as the skill's attempt: (content or None, call outcome)."""
+        try:
+            async with self.session.post(f"{base_url}/api/chat", json={"model": "stub", "messages": []}) as response:
+                if response.status >= 400:
+                    return None, {"outcome": "http_error"}
+                body = await response.json()
+                return body["message"]["content"], {"outcome": "ok"}
+        except (OSError, asyncio.TimeoutError, aiohttp.ClientError):
+            return None, {"outcome": "transport_error"}
+
+    async def run(self, pool: BackendPool, hedge_after_sec: Optional[float] = None) -> Tuple[Optional[str], Any]:
+        return await pool.run(
+            self.attempt,
+            hedge_after_sec,
+            is_ok=lambda value: value[0] is not None,
+            is_error=lambda value: value[1].get("outcome") in ("http_error", "transport_error")
+        )
+
+    def check(self, label: str, ok: bool, detail: str) -> None:
+        print(f"  [{'ok' if ok else 'FAIL'}] {label}: {detail}")
+        if not ok:
+            self.failures.append(label)
+
+    def requests_by_name(self, pool: BackendPool) -> Dict[str, int]:
+        names = self.names()
+        return {names[url]: entry["requests"] for url, entry in pool.metrics["byBackend"].items()}
+
+    async def least_outstanding(self, concurrent: int) -> None:
+        print(f"least outstanding: {concurrent} concurrent calls, both backends answering")
+        self.failing.broken = False
+        pool = BackendPool([self.slow.url, self.failing.url])
+        results = await asyncio.gather(*(self.run(pool) for _ in range(concurrent)))
+        counts = self.requests_by_name(pool)
+        self.check("spread", abs(counts["slow"] - counts["failing"]) <= 1, f"requests {counts}")
+        self.check("answered", all(value and value[0] for _, value in results), f"{len(results)} answers")
+
+    async def failover(self) -> None:
+        print("failover: failing backend listed first, no hedging")
+        self.failing.broken = True
+        pool = BackendPool([self.failing.url, self.slow.url], fail_threshold=1, cooldown_sec=30)
+        for _ in range(2):
+            url, value = await self.run(pool)
+            self.check("served by slow", url == self.slow.url and bool(value and value[0]), f"from {self.names().get(url)}")
+        # The first call fails over; the error ejects the backend, so the second goes straight to slow.
+        self.check("one failover", pool.metrics["failovers"] == 1, f"failovers {pool.metrics['failovers']}")
+        self.check("ejected after errors", not pool.is_healthy(self.failing.url),
+                   f"down {[self.names()[url] for url in pool.snapshot()['down']]}")
+
+    async def health_ejection(self, concurrent: int, cooldown_sec: float) -> None:
+        print("health probe: failing backend ejected by /api/tags, then readmitted")
+        self.failing.broken = True
+        pool = BackendPool([self.slow.url, self.failing.url], health_path="/api/tags", cooldown_sec=cooldown_sec)
+        probes = await pool.check_health()
+        self.check("probe marks down", probes.get(self.failing.url) is False and not pool.is_healthy(self.failing.url),
+                   f"probe {dict((self.names()[url], ok) for url, ok in probes.items())}")
+        before = self.failing.chats
+        await asyncio.gather(*(self.run(pool) for _ in range(concurrent)))
+        self.check("no traffic while down", self.failing.chats == before,
+                   f"requests {self.requests_by_name(pool)} despite slow having more in flight")
+        self.failing.broken = False
+        await asyncio.sleep(cooldown_sec)
+        probes = await pool.check_health()
+        self.check("readmitted", pool.is_healthy(self.failing.url), f"probe {dict((self.names()[url], ok) for url, ok in probes.items())}")
+
+    async def hedging(self, hedge_after_sec: float) -> None:
+        print(f"hedging: slow primary, hedge after {hedge_after_sec * 1000:.0f} ms")
+        self.failing.broken = False
+        pool = BackendPool([self.slow.url, self.failing.url])
+        started = time.perf_counter()
+        url, _ = await self.run(pool, hedge_after_sec)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.check("hedge wins", url == self.failing.url and pool.metrics["hedgeWins"] == 1,
+                   f"from {self.names().get(url)} in {elapsed_ms:.0f} ms (slow takes {self.slow.delay_sec * 1000:.0f} ms)")
+        self.check("slow cancelled", not pool.snapshot()["outstanding"], f"outstanding {pool.snapshot()['outstanding']}")
+
+        print("hedging: hedge lands on the broken backend")
+        self.failing.broken = True
+        pool = BackendPool([self.slow.url, self.failing.url])
+        url, value = await self.run(pool, hedge_after_sec)
+        self.check("slow still answers", url == self.slow.url and bool(value and value[0]),
+                   f"from {self.names().get(url)}, hedged {pool.metrics['hedged']}, errors "
+                   f"{pool.metrics['byBackend'][self.failing.url]['errors']}")
+
+
+async def main_async(args: argparse.Namespace) -> int:
+    slow = StubBackend("slow", delay_sec=args.slow_ms / 1000)
+    failing = StubBackend("failing", broken=True)
+    await slow.start()
+    await failing.start()
+    harness = Harness(slow, failing)
+    try:
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10)) as session:
+            harness.session = session
+            await harness.least_outstanding(args.concurrent)
+            await harness.failover()
+            await harness.health_ejection(args.concurrent, cooldown_sec=0.3)
+            await harness.hedging(args.hedge_ms / 1000)
+    finally:
+        await slow.stop()
+        await failing.stop()
+    print("all checks passed" if not harness.failures else f"failed: {', '.join(harness.failures)}")
+    return 1 if harness.failures else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--slow-ms", type=int, default=600)
+    parser.add_argument("--hedge-ms", type=int, default=150)
+    parser.add_argument("--concurrent", type=int, default=8)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
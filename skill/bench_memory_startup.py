@@ -0,0 +1,111 @@
+"""
+Startup benchmark for long memory: plain JSON vs sectioned memory files for N agents.
+
+    python bench_memory_startup.py --agents 50 --relationships 200
+
+Reports the time to load every agent's memory as a fleet restart would: parsing the whole
+legacy file, parsing only the hot sections, and parsing everything through the sectioned path.
+"""
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+from memory_records import to_json
+from memory_sections import decode_sections, encode_sections
+from moltville_skill import HYDRATED_SECTIONS, MOLTVILLESkill
+
+WORDS = "hola mercado plaza trabajo voto ayuda panaderia biblioteca alcalde casa dinero amigo evento".split()
+
+
+def synthetic_memory(rng: random.Random, episodes: int, relationships: int) -> Dict[str, Any]:
+    agents = [f"agent-{i}" for i in range(relationships)]
+    return {
+        "episodes": [
+            {
+                "type": "conversation_message",
+                "data": {
+                    "conversationId": f"conv-{i // 6}",
+                    "from": rng.choice(agents),
+                    "message": " ".join(rng.choice(WORDS) for _ in range(18))
+                },
+                "timestamp": 1000 * i
+            }
+            for i in range(episodes)
+        ],
+        "notes": [" ".join(rng.choice(WORDS) for _ in range(12)) for _ in range(40)],
+        "relationships": {
+            agent: {"affinity": rng.randint(-5, 5), "trust": rng.randint(-5, 5), "respect": 0,
+                    "lastNote": "neutral", "lastMessage": " ".join(rng.choice(WORDS) for _ in range(10))}
+            for agent in agents
+        },
+        "aggregates": {
+            "folded": 500,
+            "partners": {
+                agent: {"messagesIn": 10, "messagesOut": 8, "conversations": 2, "firstContact": 1, "lastContact": 2,
+                        "topics": {word: rng.randint(1, 9) for word in rng.sample(WORDS, 8)}, "sentiment": 0.2, "trend": 0.0}
+                for agent in agents
+            },
+            "conversations": {}
+        },
+        "planState": {"intent": "social", "steps": [{"id": f"s{i}", "status": "pending"} for i in range(6)]},
+        "goalState": {"goals": []},
+        "motivationState": {"desire": "casa", "chain": [{"id": f"c{i}", "label": "paso", "status": "pending"} for i in range(6)]},
+        "healthMetrics": {"cycles": 100},
+        "pendingActions": [],
+        "jobStrategy": {},
+        "journalSeq": 0
+    }
+
+
+def timed(label: str, agents: int, fn) -> None:
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<26} {elapsed * 1000:9.1f} ms total  {elapsed * 1000 / agents:7.2f} ms/agent")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--agents", type=int, default=50)
+    parser.add_argument("--episodes", type=int, default=80)
+    parser.add_argument("--relationships", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy, sectioned = [], []
+        for i in range(args.agents):
+            memory = synthetic_memory(rng, args.episodes, args.relationships)
+            legacy_path = Path(tmp) / f"legacy-{i}.json"
+            legacy_path.write_text(json.dumps(memory, indent=2))
+            sectioned_path = Path(tmp) / f"sectioned-{i}.json"
+            sectioned_path.write_text(encode_sections(MOLTVILLESkill._hydrate_memory(memory), default=to_json))
+            legacy.append(legacy_path)
+            sectioned.append(sectioned_path)
+        size = sum(path.stat().st_size for path in sectioned) / args.agents
+        print(f"{args.agents} agents, {args.episodes} episodes, {args.relationships} relationships, ~{size / 1024:.0f} KB/file")
+
+        def load_legacy() -> None:
+            for path in legacy:
+                MOLTVILLESkill._hydrate_memory(json.loads(path.read_bytes()))
+
+        def load_hot() -> None:
+            for path in sectioned:
+                decode_sections(path.read_bytes(), MOLTVILLESkill._hydrate_section, HYDRATED_SECTIONS)
+
+        def load_full() -> None:
+            for path in sectioned:
+                decode_sections(path.read_bytes(), MOLTVILLESkill._hydrate_section, HYDRATED_SECTIONS).load_all()
+
+        timed("plain JSON (all)", args.agents, load_legacy)
+        timed("sectioned (hot only)", args.agents, load_hot)
+        timed("sectioned (all sections)", args.agents, load_full)
+
+
+if __name__ == "__main__":
+    main()
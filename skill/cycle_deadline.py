@@ -0,0 +1,50 @@
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+# Absolute loop-time deadline of the decision cycle running in the current task, if any.
+# Tasks spawned inside the cycle inherit it through the copied context.
+_deadline: ContextVar[Optional[float]] = ContextVar("moltville_cycle_deadline", default=None)
+
+
+def _now() -> float:
+    return asyncio.get_event_loop().time()
+
+
+@contextmanager
+def cycle_deadline(budget_sec: Optional[float]) -> Iterator[Optional[float]]:
+    """Bound everything awaited inside the block to ``budget_sec`` (never extends an outer deadline)."""
+    if budget_sec is None:
+        yield _deadline.get()
+        return
+    deadline = _now() + max(0.0, float(budget_sec))
+    outer = _deadline.get()
+    if outer is not None:
+        deadline = min(deadline, outer)
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current cycle, or None outside a cycle."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - _now())
+
+
+def bounded(timeout: Optional[float]) -> Optional[float]:
+    """``timeout`` clipped to the remaining cycle budget."""
+    left = remaining()
+    if left is None:
+        return timeout
+    return left if timeout is None else min(float(timeout), left)
+
+
+def expired(margin_sec: float = 0.0) -> bool:
+    left = remaining()
+    return left is not None and left <= margin_sec
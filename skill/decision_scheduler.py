@@ -0,0 +1,103 @@
+import asyncio
+from typing import Any, Dict, Hashable, Optional
+
+
+class DecisionScheduler:
+    """Paces decision cycles: wakes early on events, backs off exponentially while nothing changes.
+
+    A cycle counts as idle when no event was notified and the observed world key did not change
+    since the previous cycle; each idle cycle multiplies the wait by ``backoff`` up to
+    ``max_interval_sec``, and any activity resets it. Cycles never start closer together than
+    ``min_spacing_sec``, however many events arrive.
+    """
+
+    def __init__(self, base_interval_sec: float, max_interval_sec: Optional[float] = None, min_spacing_sec: float = 2.0, backoff: float = 1.6):
+        self.min_spacing_sec = max(0.0, float(min_spacing_sec))
+        self.base_interval_sec = max(self.min_spacing_sec, float(base_interval_sec))
+        self.max_interval_sec = max(self.base_interval_sec, float(max_interval_sec or self.base_interval_sec * 4))
+        self.backoff = max(1.0, float(backoff))
+        self.interval_sec = self.base_interval_sec
+        self._event = asyncio.Event()
+        self._reason: Optional[str] = None
+        self._in_cycle = False
+        self._started_at = 0.0
+        self._ended_at = 0.0
+        self._events_since_end = 0
+        self._key: Optional[Hashable] = None
+        self._key_at_end: Optional[Hashable] = None
+        self.metrics: Dict[str, Any] = {"cycles": 0, "idleCycles": 0, "timerWakeups": 0, "spacingDelays": 0, "wakeups": {}}
+
+    def _now(self) -> float:
+        return asyncio.get_event_loop().time()
+
+    @property
+    def in_cycle(self) -> bool:
+        return self._in_cycle
+
+    def notify(self, reason: str, wake: bool = True) -> None:
+        """Record activity; with ``wake`` the next cycle starts as soon as spacing allows."""
+        self._events_since_end += 1
+        self.interval_sec = self.base_interval_sec
+        if wake:
+            self._reason = reason
+            self._event.set()
+
+    def observe(self, key: Hashable) -> None:
+        """Track the world state key; a change seen between cycles wakes the loop."""
+        if key == self._key:
+            return
+        self._key = key
+        if not self._in_cycle:
+            self.notify("perception")
+
+    def begin(self) -> None:
+        """A cycle starts; it serves every wakeup requested so far."""
+        self._in_cycle = True
+        self._started_at = self._now()
+        self._event.clear()
+        self._reason = None
+        self.metrics["cycles"] += 1
+
+    def end(self) -> None:
+        self._in_cycle = False
+        self._ended_at = self._now()
+        if self._events_since_end or self._key != self._key_at_end:
+            self.interval_sec = self.base_interval_sec
+        else:
+            self.interval_sec = min(self.max_interval_sec, self.interval_sec * self.backoff)
+            self.metrics["idleCycles"] += 1
+        self._events_since_end = 0
+        self._key_at_end = self._key
+
+    async def wait(self) -> str:
+        """Sleep until the next cycle is due; returns what woke it (an event reason or ``timer``)."""
+        deadline = self._ended_at + self.interval_sec
+        while True:
+            now = self._now()
+            if self._event.is_set():
+                spacing_left = self._started_at + self.min_spacing_sec - now
+                if spacing_left <= 0:
+                    reason = self._reason or "event"
+                    wakeups = self.metrics["wakeups"]
+                    wakeups[reason] = wakeups.get(reason, 0) + 1
+                    return reason
+                self.metrics["spacingDelays"] += 1
+                await asyncio.sleep(spacing_left)
+                continue
+            if now >= deadline:
+                self.metrics["timerWakeups"] += 1
+                return "timer"
+            try:
+                await asyncio.wait_for(self._event.wait(), timeout=deadline - now)
+            except asyncio.TimeoutError:
+                pass
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **self.metrics,
+            "wakeups": dict(self.metrics["wakeups"]),
+            "intervalSec": round(self.interval_sec, 3),
+            "baseIntervalSec": self.base_interval_sec,
+            "maxIntervalSec": self.max_interval_sec,
+            "minSpacingSec": self.min_spacing_sec
+        }
@@ -1,47 +1,118 @@
-import asyncio
-from typing import Any, Dict, List, Optional
+import heapq
+import itertools
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Only the newest intent of these types matters: it replaces the queued one with the same key.
+# Any other type with an equal key is the same intent queued twice and is merged instead.
+SUPERSEDING_TYPES = ("move_to", "coord_update_commit")
+
+
+def dedup_key(action: Dict[str, Any]) -> Optional[Tuple[Any, ...]]:
+    """Semantic identity of an action: queued actions with the same key are redundant."""
+    action_type = action.get("type")
+    if not action_type:
+        return None
+    params = action.get("params") if isinstance(action.get("params"), dict) else {}
+    if action_type == "move_to":
+        return ("move_to",)
+    if action_type == "vote_job":
+        return ("vote_job", params.get("applicant_id"), params.get("job_id"))
+    if action_type == "coord_update_commit":
+        return ("coord_update_commit", params.get("commitment_id") or params.get("proposal_id"))
+    try:
+        return (action_type, json.dumps(params, sort_keys=True, default=str))
+    except (TypeError, ValueError):
+        return None
 
 
 class ActionIntentQueue:
-    """Persistent priority queue with TTL and expiration metrics."""
+    """Persistent priority queue with TTL and expiration metrics.
+
+    Items live in a max-priority heap (FIFO among equal priorities) and a second heap ordered by
+    expiry, so enqueue, dequeue and expiry are O(log n). Removed items are only marked dead and
+    skipped when they reach the top of a heap. Timestamps are wall-clock milliseconds so TTLs
+    stay meaningful across restarts. At most one live item exists per ``dedup_key``.
+    """
 
     def __init__(self, items: Optional[List[Dict[str, Any]]] = None, max_size: int = 40, default_ttl_sec: int = 90):
         self.max_size = max_size
         self.default_ttl_sec = max(5, int(default_ttl_sec))
-        self._queue: List[Dict[str, Any]] = []
+        # Entries are [-priority, seq, item, alive, key].
+        self._heap: List[List[Any]] = []
+        self._expiry: List[List[Any]] = []
+        self._by_key: Dict[Tuple[Any, ...], List[Any]] = {}
+        self._seq = itertools.count()
+        self._live = 0
         self.metrics: Dict[str, Any] = {
             "enqueued": 0,
             "dequeued": 0,
             "dropped": 0,
             "expired": 0,
+            "merged": 0,
+            "superseded": 0,
             "lastEnqueueAt": None,
             "lastDequeueAt": None,
             "maxDepth": 0
         }
         for item in list(items or []):
             self._restore_item(item)
-        self._sort()
-        self.metrics["maxDepth"] = len(self._queue)
+        self.metrics["maxDepth"] = self._live
 
     def _now_ms(self) -> int:
-        return int(asyncio.get_event_loop().time() * 1000)
+        return int(time.time() * 1000)
 
-    def _sort(self) -> None:
-        self._queue.sort(key=lambda it: float(it.get("priority", 0.0)), reverse=True)
+    def _push(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        key = dedup_key(item["action"])
+        previous = self._by_key.get(key) if key is not None else None
+        if previous is not None:
+            self._kill(previous)
+            if item["action"].get("type") in SUPERSEDING_TYPES:
+                self.metrics["superseded"] = int(self.metrics.get("superseded", 0)) + 1
+            else:
+                # Keep the queued intent (and its age) with the stronger priority and later expiry.
+                older = previous[2]
+                item = {
+                    **older,
+                    "priority": max(float(older.get("priority", 0.0)), float(item.get("priority", 0.0))),
+                    "attempts": max(int(older.get("attempts", 0)), int(item.get("attempts", 0))),
+                    "expiresAt": max(int(older["expiresAt"]), int(item["expiresAt"]))
+                }
+                self.metrics["merged"] = int(self.metrics.get("merged", 0)) + 1
+        entry = [-float(item.get("priority", 0.0)), next(self._seq), item, True, key]
+        heapq.heappush(self._heap, entry)
+        heapq.heappush(self._expiry, [int(item["expiresAt"]), entry[1], entry])
+        if key is not None:
+            self._by_key[key] = entry
+        self._live += 1
+        return item
+
+    def _kill(self, entry: List[Any]) -> None:
+        if entry[3]:
+            entry[3] = False
+            self._live -= 1
+            if entry[4] is not None and self._by_key.get(entry[4]) is entry:
+                del self._by_key[entry[4]]
 
     def _purge_expired(self) -> None:
         now = self._now_ms()
-        kept: List[Dict[str, Any]] = []
         expired = 0
-        for item in self._queue:
-            expires_at = item.get("expiresAt")
-            if isinstance(expires_at, (int, float)) and now > int(expires_at):
+        while self._expiry and self._expiry[0][0] < now:
+            _, _, entry = heapq.heappop(self._expiry)
+            if entry[3]:
+                self._kill(entry)
                 expired += 1
-                continue
-            kept.append(item)
         if expired:
             self.metrics["expired"] = int(self.metrics.get("expired", 0)) + expired
-        self._queue = kept
+        while self._heap and not self._heap[0][3]:
+            heapq.heappop(self._heap)
+        if len(self._heap) > 2 * self._live + 16:
+            # Too many dead entries left behind by drops; rebuild both heaps.
+            self._heap = [entry for entry in self._heap if entry[3]]
+            heapq.heapify(self._heap)
+            self._expiry = [record for record in self._expiry if record[2][3]]
+            heapq.heapify(self._expiry)
 
     def _normalize_item(self, item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         action = item.get("action") if isinstance(item.get("action"), dict) else None
@@ -70,11 +141,22 @@ class ActionIntentQueue:
             # Backward compatibility with legacy payloads storing action only
             item = self._normalize_item({"action": raw, "source": "legacy"})
         if item is not None:
-            self._queue.append(item)
+            self._push(item)
+            self._trim()
 
-    def enqueue(self, action: Dict[str, Any], source: str = "plan", priority: float = 1.0, ttl_sec: Optional[int] = None) -> None:
-        if not isinstance(action, dict):
+    def _trim(self) -> None:
+        overflow = self._live - self.max_size
+        if overflow <= 0:
             return
+        # Drop the lowest-priority (then newest) items; only runs when the queue is full.
+        victims = heapq.nlargest(overflow, (entry for entry in self._heap if entry[3]), key=lambda entry: (entry[0], entry[1]))
+        for entry in victims:
+            self._kill(entry)
+        self.metrics["dropped"] = int(self.metrics.get("dropped", 0)) + overflow
+
+    def enqueue(self, action: Dict[str, Any], source: str = "plan", priority: float = 1.0, ttl_sec: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        if not isinstance(action, dict):
+            return None
         created_at = self._now_ms()
         ttl_ms = int((ttl_sec if isinstance(ttl_sec, (int, float)) else self.default_ttl_sec) * 1000)
         ttl_ms = max(1000, ttl_ms)
@@ -87,30 +169,37 @@ class ActionIntentQueue:
             "ttlMs": ttl_ms,
             "expiresAt": created_at + ttl_ms
         }
-        self._queue.append(item)
-        self._sort()
-        if len(self._queue) > self.max_size:
-            overflow = len(self._queue) - self.max_size
-            if overflow > 0:
-                self._queue = self._queue[:self.max_size]
-                self.metrics["dropped"] = int(self.metrics.get("dropped", 0)) + overflow
+        self._purge_expired()
+        item = self._push(item)
+        self._trim()
         self.metrics["enqueued"] = int(self.metrics.get("enqueued", 0)) + 1
-        self.metrics["lastEnqueueAt"] = self._now_ms()
-        self.metrics["maxDepth"] = max(int(self.metrics.get("maxDepth", 0)), len(self._queue))
+        self.metrics["lastEnqueueAt"] = created_at
+        self.metrics["maxDepth"] = max(int(self.metrics.get("maxDepth", 0)), self._live)
+        return item
 
     def dequeue(self) -> Optional[Dict[str, Any]]:
         self._purge_expired()
-        if not self._queue:
-            return None
-        item = self._queue.pop(0)
-        self.metrics["dequeued"] = int(self.metrics.get("dequeued", 0)) + 1
-        self.metrics["lastDequeueAt"] = self._now_ms()
-        return item
+        while self._heap:
+            entry = heapq.heappop(self._heap)
+            if not entry[3]:
+                continue
+            self._kill(entry)
+            self.metrics["dequeued"] = int(self.metrics.get("dequeued", 0)) + 1
+            self.metrics["lastDequeueAt"] = self._now_ms()
+            return entry[2]
+        return None
 
     def snapshot(self) -> List[Dict[str, Any]]:
+        """Live items, highest priority first."""
         self._purge_expired()
-        return self._queue[:self.max_size]
+        return [entry[2] for entry in sorted(entry for entry in self._heap if entry[3])][:self.max_size]
 
     def depth(self) -> int:
         self._purge_expired()
-        return len(self._queue)
+        return self._live
+
+    def __len__(self) -> int:
+        return self.depth()
+
+    def to_json(self) -> List[Dict[str, Any]]:
+        return self.snapshot()
@@ -0,0 +1,202 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+
+class BackendPool:
+    """Least-outstanding-requests balancing over several LLM endpoints with health checks and hedging."""
+
+    def __init__(
+        self,
+        urls: Iterable[str],
+        health_path: Optional[str] = None,
+        health_interval_sec: float = 15.0,
+        health_timeout_sec: float = 2.0,
+        fail_threshold: int = 2,
+        cooldown_sec: float = 30.0
+    ):
+        self.urls: List[str] = [str(url).rstrip("/") for url in urls if url]
+        self.health_path = health_path
+        self.health_interval_sec = max(1.0, float(health_interval_sec))
+        self.health_timeout_sec = max(0.1, float(health_timeout_sec))
+        self.fail_threshold = max(1, int(fail_threshold))
+        self.cooldown_sec = max(0.0, float(cooldown_sec))
+        self._outstanding: Dict[str, int] = {url: 0 for url in self.urls}
+        self._failures: Dict[str, int] = {url: 0 for url in self.urls}
+        self._down_until: Dict[str, float] = {}
+        self._last_health_check = float("-inf")
+        self._health_task: Optional[asyncio.Task] = None
+        self.metrics: Dict[str, Any] = {
+            "hedged": 0,
+            "hedgeWins": 0,
+            "failovers": 0,
+            "byBackend": {url: {"requests": 0, "errors": 0, "wins": 0, "healthy": True} for url in self.urls}
+        }
+
+    def _now(self) -> float:
+        return asyncio.get_event_loop().time()
+
+    def is_healthy(self, url: str) -> bool:
+        return self._down_until.get(url, 0.0) <= self._now()
+
+    def _mark(self, url: str, ok: bool) -> None:
+        entry = self.metrics["byBackend"][url]
+        if ok:
+            self._failures[url] = 0
+            self._down_until.pop(url, None)
+        else:
+            entry["errors"] += 1
+            self._failures[url] += 1
+            if self._failures[url] >= self.fail_threshold:
+                self._down_until[url] = self._now() + self.cooldown_sec
+        entry["healthy"] = self.is_healthy(url)
+
+    def pick(self, exclude: Iterable[str] = ()) -> Optional[str]:
+        """Healthy backend with the fewest in-flight requests; unhealthy ones only as a last resort."""
+        self._maybe_check_health()
+        excluded = set(exclude)
+        candidates = [url for url in self.urls if url not in excluded]
+        if not candidates:
+            return None
+        healthy = [url for url in candidates if self.is_healthy(url)]
+        pool = healthy or candidates
+        return min(pool, key=lambda url: (self._outstanding[url], self._failures[url], self.urls.index(url)))
+
+    def _maybe_check_health(self) -> None:
+        if not self.health_path or (self._health_task and not self._health_task.done()):
+            return
+        if self._now() - self._last_health_check < self.health_interval_sec:
+            return
+        self._last_health_check = self._now()
+        self._health_task = asyncio.ensure_future(self.check_health())
+
+    async def check_health(self) -> Dict[str, bool]:
+        results: Dict[str, bool] = {}
+        timeout = aiohttp.ClientTimeout(total=self.health_timeout_sec)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            async def probe(url: str) -> None:
+                try:
+                    async with session.get(f"{url}{self.health_path}") as response:
+                        results[url] = response.status < 500
+                except (OSError, asyncio.TimeoutError, aiohttp.ClientError):
+                    results[url] = False
+            await asyncio.gather(*(probe(url) for url in self.urls))
+        for url, ok in results.items():
+            if ok:
+                self._mark(url, True)
+            else:
+                # A failed probe takes the backend out immediately instead of waiting for request errors.
+                self._down_until[url] = self._now() + self.cooldown_sec
+                self.metrics["byBackend"][url]["healthy"] = False
+        return results
+
+    def _launch(
+        self,
+        url: str,
+        attempt: Callable[[str], Awaitable[Any]],
+        is_ok: Callable[[Any], bool],
+        is_error: Callable[[Any], bool]
+    ) -> asyncio.Future:
+        # Count the request as outstanding right away so concurrent picks spread out.
+        self._outstanding[url] += 1
+        self.metrics["byBackend"][url]["requests"] += 1
+        return asyncio.ensure_future(self._attempt(url, attempt, is_ok, is_error))
+
+    async def _attempt(
+        self,
+        url: str,
+        attempt: Callable[[str], Awaitable[Any]],
+        is_ok: Callable[[Any], bool],
+        is_error: Callable[[Any], bool]
+    ) -> Tuple[str, Any]:
+        try:
+            value = await attempt(url)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self._mark(url, False)
+            raise
+        finally:
+            self._outstanding[url] -= 1
+        if is_ok(value):
+            self._mark(url, True)
+        elif is_error(value):
+            self._mark(url, False)
+        return url, value
+
+    async def run(
+        self,
+        attempt: Callable[[str], Awaitable[Any]],
+        hedge_after_sec: Optional[float] = None,
+        is_ok: Callable[[Any], bool] = lambda value: value is not None,
+        is_error: Optional[Callable[[Any], bool]] = None
+    ) -> Tuple[Optional[str], Any]:
+        """Run ``attempt(url)`` on the best backend, hedging to a second one after ``hedge_after_sec``.
+
+        Returns ``(url, value)`` of the first successful attempt; the other attempt is cancelled.
+        If every attempt fails, the last result is returned (or the last exception re-raised).
+        ``is_error`` decides which unsuccessful results count against a backend's health
+        (default: all of them).
+        """
+        if is_error is None:
+            is_error = lambda value: not is_ok(value)
+        primary = self.pick()
+        if primary is None:
+            return None, None
+        tasks = {self._launch(primary, attempt, is_ok, is_error): primary}
+        hedge_pending = hedge_after_sec is not None and len(self.urls) > 1
+        failover_pending = len(self.urls) > 1
+        last: Tuple[Optional[str], Any] = (primary, None)
+        last_error: Optional[BaseException] = None
+        hedge_url: Optional[str] = None
+        try:
+            while tasks:
+                timeout = hedge_after_sec if hedge_pending else None
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedge_pending = failover_pending = False
+                    second = self.pick(exclude=tasks.values())
+                    if second is not None:
+                        self.metrics["hedged"] += 1
+                        hedge_url = second
+                        tasks[self._launch(second, attempt, is_ok, is_error)] = second
+                    continue
+                for task in done:
+                    url = tasks.pop(task)
+                    if task.exception() is not None:
+                        last_error = task.exception()
+                        last = (url, None)
+                        continue
+                    _, value = task.result()
+                    if is_ok(value):
+                        self.metrics["byBackend"][url]["wins"] += 1
+                        if url == hedge_url:
+                            self.metrics["hedgeWins"] += 1
+                        return url, value
+                    last, last_error = (url, value), None
+                if not tasks and failover_pending and (last_error is not None or is_error(last[1])):
+                    # Primary failed before any hedge went out: retry once on another backend.
+                    hedge_pending = failover_pending = False
+                    second = self.pick(exclude=[primary])
+                    if second is not None:
+                        self.metrics["failovers"] += 1
+                        tasks[self._launch(second, attempt, is_ok, is_error)] = second
+        finally:
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        if last_error is not None:
+            raise last_error
+        return last
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **self.metrics,
+            "outstanding": {url: count for url, count in self._outstanding.items() if count},
+            "down": [url for url in self.urls if not self.is_healthy(url)]
+        }
@@ -0,0 +1,172 @@
+import asyncio
+import heapq
+import itertools
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+
+class LLMScheduler:
+    """Priority-aware admission control for LLM calls with bounded concurrency per backend."""
+
+    DEFAULT_PRIORITIES = {
+        "conversation": 0,
+        "decision": 1,
+        "social": 2,
+        "profile": 2,
+        "relationship": 3
+    }
+
+    def __init__(
+        self,
+        max_concurrent: int = 1,
+        background_priority: int = 3,
+        max_background_waiting: int = 2,
+        priorities: Optional[Dict[str, int]] = None,
+        deadlines_sec: Optional[Dict[str, float]] = None
+    ):
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.background_priority = int(background_priority)
+        self.max_background_waiting = max(0, int(max_background_waiting))
+        self.priorities: Dict[str, int] = {**self.DEFAULT_PRIORITIES, **(priorities or {})}
+        self.deadlines_sec: Dict[str, float] = dict(deadlines_sec or {})
+        self._inflight: Dict[str, int] = {}
+        self._waiters: Dict[str, List[Tuple[int, int, asyncio.Future]]] = {}
+        self._seq = itertools.count()
+        self.metrics: Dict[str, Any] = {
+            "granted": 0,
+            "dropped": 0,
+            "expired": 0,
+            "maxDepth": 0,
+            "byKind": {}
+        }
+
+    def _now_ms(self) -> float:
+        return asyncio.get_event_loop().time() * 1000
+
+    def priority_of(self, kind: str) -> int:
+        return int(self.priorities.get(kind, self.background_priority))
+
+    def deadline_for(self, kind: str) -> Optional[float]:
+        value = self.deadlines_sec.get(kind)
+        return float(value) if isinstance(value, (int, float)) and value > 0 else None
+
+    def _kind_metrics(self, kind: str) -> Dict[str, Any]:
+        by_kind = self.metrics.setdefault("byKind", {})
+        entry = by_kind.get(kind)
+        if entry is None:
+            entry = {"granted": 0, "dropped": 0, "expired": 0, "waitMsTotal": 0.0, "waitMsMax": 0.0, "lastWaitMs": 0.0}
+            by_kind[kind] = entry
+        return entry
+
+    def _live_waiters(self, backend: str) -> List[Tuple[int, int, asyncio.Future]]:
+        heap = self._waiters.get(backend, [])
+        return [item for item in heap if not item[2].done()]
+
+    def _has_capacity(self, backend: str) -> bool:
+        return self._inflight.get(backend, 0) < self.max_concurrent
+
+    def _grant(self, backend: str, kind: str, started_ms: float) -> Dict[str, Any]:
+        wait_ms = max(0.0, self._now_ms() - started_ms)
+        entry = self._kind_metrics(kind)
+        entry["granted"] += 1
+        entry["waitMsTotal"] = round(entry["waitMsTotal"] + wait_ms, 3)
+        entry["waitMsMax"] = round(max(entry["waitMsMax"], wait_ms), 3)
+        entry["lastWaitMs"] = round(wait_ms, 3)
+        self.metrics["granted"] += 1
+        return {"granted": True, "kind": kind, "backend": backend, "waitMs": round(wait_ms, 3), "reason": None}
+
+    def _reject(self, backend: str, kind: str, started_ms: float, reason: str) -> Dict[str, Any]:
+        entry = self._kind_metrics(kind)
+        bucket = "expired" if reason == "deadline" else "dropped"
+        entry[bucket] += 1
+        self.metrics[bucket] += 1
+        wait_ms = max(0.0, self._now_ms() - started_ms)
+        return {"granted": False, "kind": kind, "backend": backend, "waitMs": round(wait_ms, 3), "reason": reason}
+
+    async def acquire(self, kind: str, backend: str = "default", deadline_sec: Optional[float] = None) -> Dict[str, Any]:
+        """Wait for a slot on ``backend``. Returns a ticket; ``ticket["granted"]`` is False when dropped."""
+        started_ms = self._now_ms()
+        priority = self.priority_of(kind)
+        if deadline_sec is None:
+            deadline_sec = self.deadline_for(kind)
+        waiting = self._live_waiters(backend)
+        if self._has_capacity(backend) and not waiting:
+            self._inflight[backend] = self._inflight.get(backend, 0) + 1
+            return self._grant(backend, kind, started_ms)
+
+        if priority >= self.background_priority:
+            # Background work never queues behind user-visible calls, and only a few may wait.
+            if any(item[0] < self.background_priority for item in waiting):
+                return self._reject(backend, kind, started_ms, "pressure")
+            background_waiting = sum(1 for item in waiting if item[0] >= self.background_priority)
+            if background_waiting >= self.max_background_waiting:
+                return self._reject(backend, kind, started_ms, "pressure")
+        else:
+            self._shed_background(backend)
+
+        future: asyncio.Future = asyncio.get_event_loop().create_future()
+        heap = self._waiters.setdefault(backend, [])
+        heapq.heappush(heap, (priority, next(self._seq), future))
+        self.metrics["maxDepth"] = max(int(self.metrics.get("maxDepth", 0)), len(self._live_waiters(backend)))
+        try:
+            await asyncio.wait_for(future, timeout=deadline_sec)
+        except asyncio.TimeoutError:
+            self._discard(backend, future)
+            return self._reject(backend, kind, started_ms, "deadline")
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Slot was handed over just before the caller went away.
+                self.release(backend)
+            self._discard(backend, future)
+            raise
+        if future.result() is False:
+            return self._reject(backend, kind, started_ms, "shed")
+        return self._grant(backend, kind, started_ms)
+
+    def _discard(self, backend: str, future: asyncio.Future) -> None:
+        heap = self._waiters.get(backend)
+        if not heap:
+            return
+        kept = [item for item in heap if item[2] is not future and not item[2].done()]
+        heapq.heapify(kept)
+        self._waiters[backend] = kept
+
+    def release(self, backend: str = "default") -> None:
+        self._inflight[backend] = max(0, self._inflight.get(backend, 0) - 1)
+        heap = self._waiters.get(backend, [])
+        while heap and self._has_capacity(backend):
+            _, _, future = heapq.heappop(heap)
+            if future.done():
+                continue
+            self._inflight[backend] = self._inflight.get(backend, 0) + 1
+            future.set_result(True)
+
+    def _shed_background(self, backend: str) -> int:
+        """Drop queued background waiters when a user-visible call has to wait for the backend."""
+        shed = 0
+        kept = []
+        for item in self._waiters.get(backend, []):
+            if item[0] >= self.background_priority and not item[2].done():
+                item[2].set_result(False)
+                shed += 1
+                continue
+            kept.append(item)
+        heapq.heapify(kept)
+        self._waiters[backend] = kept
+        return shed
+
+    @asynccontextmanager
+    async def slot(self, kind: str, backend: str = "default", deadline_sec: Optional[float] = None) -> AsyncIterator[Dict[str, Any]]:
+        ticket = await self.acquire(kind, backend, deadline_sec)
+        try:
+            yield ticket
+        finally:
+            if ticket.get("granted"):
+                self.release(backend)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **self.metrics,
+            "inflight": {key: value for key, value in self._inflight.items() if value},
+            "waiting": {key: len(self._live_waiters(key)) for key in self._waiters if self._live_waiters(key)}
+        }
@@ -0,0 +1,149 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Canonical parameters of every action type the LLM may return. `_sanitize_llm_action`
+# accepts these types (plus a few parameter aliases); the JSON schemas below are built
+# from the same table so constrained decoding can only produce actions it understands.
+ACTION_PARAMS: Dict[str, Dict[str, Any]] = {
+    "move_to": {"x": {"type": "integer"}, "y": {"type": "integer"}},
+    "enter_building": {"building_id": {"type": "string"}},
+    "speak": {"message": {"type": "string"}},
+    "apply_job": {"job_id": {"type": "string"}},
+    "buy_property": {"property_id": {"type": "string"}},
+    "vote_job": {"applicant_id": {"type": "string"}, "job_id": {"type": "string"}},
+    "create_event": {
+        "name": {"type": "string"},
+        "description": {"type": "string"},
+        "location": {
+            "type": "object",
+            "properties": {"x": {"type": "integer"}, "y": {"type": "integer"}}
+        }
+    },
+    "join_event": {"event_id": {"type": "string"}},
+    "wait": {},
+    "start_conversation": {"target_id": {"type": "string"}, "message": {"type": "string"}},
+    "conversation_message": {"conversation_id": {"type": "string"}, "message": {"type": "string"}},
+    "end_conversation": {"conversation_id": {"type": "string"}}
+}
+
+# Parameters that are optional in the canonical form.
+OPTIONAL_PARAMS = {"create_event": {"description", "location"}}
+
+# Other parameter shapes `_sanitize_llm_action` resolves for a type (move_to can name a
+# building/agent or a known place instead of coordinates).
+ALTERNATIVE_PARAMS: Dict[str, Tuple[Dict[str, Any], ...]] = {
+    "move_to": ({"target_id": {"type": "string"}}, {"location": {"type": "string"}})
+}
+
+# Follow-up steps accepted by `_sanitize_followup_action`.
+FOLLOWUP_TYPES = ("move_to", "enter_building", "join_event", "wait")
+
+ACTION_TYPES = tuple(ACTION_PARAMS)
+
+MESSAGE_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {"message": {"type": "string"}},
+    "required": ["message"]
+}
+
+PROFILE_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "traits": {
+            "type": "object",
+            "properties": {
+                name: {"type": "number"}
+                for name in (
+                    "ambition", "sociability", "curiosity", "discipline", "morality",
+                    "aggression", "deception", "empathy", "risk"
+                )
+            },
+            "required": [
+                "ambition", "sociability", "curiosity", "discipline", "morality",
+                "aggression", "deception", "empathy", "risk"
+            ]
+        },
+        "goals": {"type": "array", "items": {"type": "string"}},
+        "style": {"type": "string"},
+        "backstory": {"type": "string"},
+        "values": {"type": "array", "items": {"type": "string"}},
+        "quirks": {"type": "array", "items": {"type": "string"}},
+        "tactics": {"type": "array", "items": {"type": "string"}}
+    },
+    "required": ["traits", "goals", "style", "backstory", "values", "quirks", "tactics"]
+}
+
+RELATIONSHIP_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "results": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "otherId": {"type": "string"},
+                    "affinityDelta": {"type": "integer"},
+                    "trustDelta": {"type": "integer"},
+                    "respectDelta": {"type": "integer"},
+                    "note": {"type": "string"}
+                },
+                "required": ["otherId", "affinityDelta", "trustDelta", "respectDelta", "note"]
+            }
+        }
+    },
+    "required": ["results"]
+}
+
+
+def _closed_object(params: Dict[str, Any], optional: Iterable[str] = ()) -> Dict[str, Any]:
+    # Closed shapes keep one variant from matching another's params: an open empty
+    # ``wait`` variant would otherwise accept anything, e.g. a move_to without x/y.
+    schema: Dict[str, Any] = {
+        "type": "object",
+        "properties": params,
+        "required": [name for name in params if name not in optional],
+        "additionalProperties": False
+    }
+    if not params:
+        schema["maxProperties"] = 0
+    return schema
+
+
+def _params_schema(types: Iterable[str]) -> Dict[str, Any]:
+    variants: List[Dict[str, Any]] = []
+    for action_type in types:
+        variants.append(_closed_object(ACTION_PARAMS[action_type], OPTIONAL_PARAMS.get(action_type, set())))
+        variants.extend(_closed_object(params) for params in ALTERNATIVE_PARAMS.get(action_type, ()))
+    return variants[0] if len(variants) == 1 else {"anyOf": variants}
+
+
+def action_schema(types: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """JSON schema for one action, restricted to ``types`` when given.
+
+    The root stays a plain object (some providers reject a root ``anyOf``); ``params`` is
+    constrained to the union of the selected types' parameter shapes.
+    """
+    selected = [t for t in (types or ACTION_TYPES) if t in ACTION_PARAMS]
+    return {
+        "type": "object",
+        "properties": {
+            "type": {"type": "string", "enum": selected},
+            "params": _params_schema(selected),
+            "nextStep": {
+                "type": "object",
+                "properties": {
+                    "type": {"type": "string", "enum": list(FOLLOWUP_TYPES)},
+                    "params": _params_schema(FOLLOWUP_TYPES)
+                },
+                "required": ["type", "params"]
+            }
+        },
+        "required": ["type", "params"]
+    }
+
+
+SCHEMAS: Dict[str, Dict[str, Any]] = {
+    "action": action_schema(),
+    "message": MESSAGE_SCHEMA,
+    "profile": PROFILE_SCHEMA,
+    "relationship": RELATIONSHIP_SCHEMA
+}
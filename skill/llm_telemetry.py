@@ -0,0 +1,177 @@
+import json
+import logging
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+OUTCOMES = (
+    "ok",
+    "dropped",
+    "deadline",
+    "cancelled",
+    "http_error",
+    "transport_error",
+    "empty",
+    "parse_failure",
+    "sanitize_rejected",
+    "validation_rejected"
+)
+
+
+class LLMTelemetry:
+    """Per-prompt-kind LLM call statistics with an optional JSONL trace."""
+
+    def __init__(self, trace_path: Optional[Path] = None, trace_max_bytes: int = 5 * 1024 * 1024, window: int = 200):
+        self.trace_path = trace_path
+        self.trace_max_bytes = max(64 * 1024, int(trace_max_bytes))
+        self.window = max(10, int(window))
+        self._kinds: Dict[str, Dict[str, Any]] = {}
+        self._latency: Dict[str, Deque[float]] = {}
+        # (monotonic time, latency) so routing can look at recent samples only.
+        self._model_latency: Dict[str, Deque[Tuple[float, float]]] = {}
+        self._seq = 0
+
+    def begin(self, kind: str, model: Optional[str] = None, tier: Optional[str] = None) -> Dict[str, Any]:
+        self._seq += 1
+        return {
+            "id": self._seq,
+            "kind": kind,
+            "model": model,
+            "tier": tier,
+            "backend": None,
+            "startedAt": time.time(),
+            "_t0": time.perf_counter(),
+            "waitMs": None,
+            "ttfbMs": None,
+            "latencyMs": None,
+            "status": None,
+            "promptBytes": 0,
+            "completionBytes": 0,
+            "promptTokens": None,
+            "completionTokens": None,
+            "outcome": None,
+            "error": None,
+            "finished": False
+        }
+
+    def mark_sent(self, call: Dict[str, Any]) -> None:
+        call["_sent"] = time.perf_counter()
+
+    def mark_first_byte(self, call: Dict[str, Any]) -> None:
+        call["ttfbMs"] = round((time.perf_counter() - call.get("_sent", call["_t0"])) * 1000, 2)
+
+    def mark_done(self, call: Dict[str, Any]) -> None:
+        call["latencyMs"] = round((time.perf_counter() - call.get("_sent", call["_t0"])) * 1000, 2)
+
+    def _kind_stats(self, kind: str) -> Dict[str, Any]:
+        stats = self._kinds.get(kind)
+        if stats is None:
+            stats = {
+                "calls": 0,
+                "outcomes": {name: 0 for name in OUTCOMES},
+                "latencyMsTotal": 0.0,
+                "latencyMsMax": 0.0,
+                "ttfbMsTotal": 0.0,
+                "timedCalls": 0,
+                "promptBytes": 0,
+                "completionBytes": 0,
+                "promptTokens": 0,
+                "completionTokens": 0,
+                "parseRecovered": 0
+            }
+            self._kinds[kind] = stats
+        return stats
+
+    def note_parse_recovered(self, call: Dict[str, Any]) -> None:
+        self._kind_stats(call["kind"])["parseRecovered"] += 1
+
+    def finish(self, call: Dict[str, Any], outcome: str, error: Optional[str] = None) -> None:
+        """Close a call record once; the first outcome wins."""
+        if call.get("finished"):
+            return
+        call["finished"] = True
+        call["outcome"] = call.get("outcome") or outcome
+        if error:
+            call["error"] = error[:200]
+        stats = self._kind_stats(call["kind"])
+        stats["calls"] += 1
+        stats["outcomes"][call["outcome"]] = stats["outcomes"].get(call["outcome"], 0) + 1
+        stats["promptBytes"] += int(call.get("promptBytes") or 0)
+        stats["completionBytes"] += int(call.get("completionBytes") or 0)
+        stats["promptTokens"] += int(call.get("promptTokens") or 0)
+        stats["completionTokens"] += int(call.get("completionTokens") or 0)
+        latency = call.get("latencyMs")
+        if isinstance(latency, (int, float)):
+            stats["timedCalls"] += 1
+            stats["latencyMsTotal"] = round(stats["latencyMsTotal"] + latency, 2)
+            stats["latencyMsMax"] = max(stats["latencyMsMax"], latency)
+            stats["ttfbMsTotal"] = round(stats["ttfbMsTotal"] + float(call.get("ttfbMs") or 0), 2)
+            self._latency.setdefault(call["kind"], deque(maxlen=self.window)).append(float(latency))
+            if call.get("model"):
+                self._model_latency.setdefault(str(call["model"]), deque(maxlen=self.window)).append((time.monotonic(), float(latency)))
+        self._trace(call)
+
+    def _trace(self, call: Dict[str, Any]) -> None:
+        if not self.trace_path:
+            return
+        record = {key: value for key, value in call.items() if not key.startswith("_") and key != "finished"}
+        try:
+            if self.trace_path.exists() and self.trace_path.stat().st_size > self.trace_max_bytes:
+                self.trace_path.replace(self.trace_path.with_name(self.trace_path.name + ".1"))
+            with self.trace_path.open("a", encoding="utf-8") as handle:
+                handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError as error:
+            logger.debug(f"Failed to write LLM trace: {error}")
+
+    @staticmethod
+    def _percentile(samples: Iterable[float], q: float) -> Optional[float]:
+        ordered = sorted(samples)
+        if not ordered:
+            return None
+        index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+        return round(ordered[index], 2)
+
+    def latency_percentile(self, kind: str, q: float) -> Optional[float]:
+        return self._percentile(self._latency.get(kind, deque()), q)
+
+    def model_latency_percentile(
+        self,
+        model: str,
+        q: float,
+        min_samples: int = 1,
+        max_age_sec: Optional[float] = None,
+        last: Optional[int] = None
+    ) -> Optional[float]:
+        """Latency percentile of ``model`` over its samples from the last ``max_age_sec`` (at most ``last`` of them)."""
+        samples = list(self._model_latency.get(model, ()))
+        if max_age_sec is not None:
+            cutoff = time.monotonic() - max_age_sec
+            samples = [sample for sample in samples if sample[0] >= cutoff]
+        if last is not None:
+            samples = samples[-max(1, int(last)):]
+        if len(samples) < max(1, min_samples):
+            return None
+        return self._percentile((latency for _, latency in samples), q)
+
+    def snapshot(self) -> Dict[str, Any]:
+        kinds = {}
+        for kind, stats in self._kinds.items():
+            timed = stats["timedCalls"] or 0
+            samples = self._latency.get(kind, deque())
+            kinds[kind] = {
+                **stats,
+                "outcomes": {name: count for name, count in stats["outcomes"].items() if count},
+                "latencyMsAvg": round(stats["latencyMsTotal"] / timed, 2) if timed else None,
+                "latencyMsP50": self._percentile(samples, 0.5),
+                "latencyMsP90": self._percentile(samples, 0.9),
+                "ttfbMsAvg": round(stats["ttfbMsTotal"] / timed, 2) if timed else None,
+                "wasteRate": round(1 - stats["outcomes"].get("ok", 0) / stats["calls"], 4) if stats["calls"] else 0.0
+            }
+        models = {
+            model: {"samples": len(samples), "latencyMsP90": self._percentile((latency for _, latency in samples), 0.9)}
+            for model, samples in self._model_latency.items()
+        }
+        return {"kinds": kinds, "models": models, "tracePath": str(self.trace_path) if self.trace_path else None}
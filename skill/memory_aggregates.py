@@ -0,0 +1,223 @@
+import re
+import sys
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from memory_records import Episode
+from sentiment_lexicon import fold
+
+TOKEN_RE = re.compile(r"[a-z]{4,}")
+STOPWORDS = {
+    "para", "pero", "como", "esto", "esta", "este", "estas", "estos", "porque", "cuando", "donde", "sobre",
+    "tambien", "entonces", "quiero", "puedo", "puedes", "tengo", "tienes", "hola", "gracias", "bien", "algo",
+    "todo", "todos", "mucho", "muy", "hace", "hacer", "creo", "claro", "vale", "aqui", "ahora", "luego",
+    "that", "this", "with", "have", "what", "your", "from", "there", "they", "would", "about", "just", "will",
+    "been", "were", "when", "then", "than", "here", "hello", "thanks"
+}
+# Keyword counters are pruned back to this many entries (lowest counts go first), keeping each
+# aggregate constant-size no matter how much history is folded into it.
+MAX_TOPICS = 16
+TREND_ALPHA = 0.3
+
+
+def _keywords(text: str) -> List[str]:
+    return [token for token in TOKEN_RE.findall(fold(text)) if token not in STOPWORDS]
+
+
+def _add_topics(topics: Dict[str, int], text: str) -> None:
+    for token in _keywords(text):
+        topics[token] = topics.get(token, 0) + 1
+    if len(topics) > MAX_TOPICS:
+        for token, _ in sorted(topics.items(), key=lambda item: item[1])[:len(topics) - MAX_TOPICS]:
+            del topics[token]
+
+
+def _top(topics: Dict[str, int], count: int) -> List[str]:
+    return [token for token, _ in sorted(topics.items(), key=lambda item: -item[1])[:count]]
+
+
+class PartnerAggregate:
+    """Running totals of everything folded out of the episode buffer for one counterpart."""
+
+    __slots__ = ("messages_in", "messages_out", "conversations", "first_contact", "last_contact", "topics", "sentiment", "trend")
+
+    def __init__(self):
+        self.messages_in = 0
+        self.messages_out = 0
+        self.conversations = 0
+        self.first_contact = 0
+        self.last_contact = 0
+        self.topics: Dict[str, int] = {}
+        # Exponential moving averages of message polarity and of its change (positive while warming up).
+        self.sentiment = 0.0
+        self.trend = 0.0
+
+    def touch(self, timestamp: int) -> None:
+        if not self.first_contact or (timestamp and timestamp < self.first_contact):
+            self.first_contact = timestamp
+        self.last_contact = max(self.last_contact, timestamp)
+
+    def add_sentiment(self, polarity: float) -> None:
+        previous = self.sentiment
+        self.sentiment = (1 - TREND_ALPHA) * previous + TREND_ALPHA * polarity
+        self.trend = (1 - TREND_ALPHA) * self.trend + TREND_ALPHA * (self.sentiment - previous)
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "messagesIn": self.messages_in,
+            "messagesOut": self.messages_out,
+            "conversations": self.conversations,
+            "firstContact": self.first_contact,
+            "lastContact": self.last_contact,
+            "topics": dict(self.topics),
+            "sentiment": round(self.sentiment, 4),
+            "trend": round(self.trend, 4)
+        }
+
+    @classmethod
+    def from_json(cls, raw: Dict[str, Any]) -> "PartnerAggregate":
+        agg = cls()
+        agg.messages_in = int(raw.get("messagesIn", 0) or 0)
+        agg.messages_out = int(raw.get("messagesOut", 0) or 0)
+        agg.conversations = int(raw.get("conversations", 0) or 0)
+        agg.first_contact = int(raw.get("firstContact", 0) or 0)
+        agg.last_contact = int(raw.get("lastContact", 0) or 0)
+        agg.topics = {str(k): int(v) for k, v in (raw.get("topics") or {}).items()}
+        agg.sentiment = float(raw.get("sentiment", 0.0) or 0.0)
+        agg.trend = float(raw.get("trend", 0.0) or 0.0)
+        return agg
+
+    def summary(self, partner_id: str) -> Dict[str, Any]:
+        return {
+            "with": partner_id,
+            "messages": self.messages_in + self.messages_out,
+            "conversations": self.conversations,
+            "lastContact": self.last_contact,
+            "topics": _top(self.topics, 5),
+            "sentiment": round(self.sentiment, 2),
+            "trend": "up" if self.trend > 0.05 else ("down" if self.trend < -0.05 else "flat")
+        }
+
+
+class ConversationAggregate:
+    __slots__ = ("partner", "messages", "started", "last_activity", "ended", "topics")
+
+    def __init__(self, partner: Optional[str] = None):
+        self.partner = partner
+        self.messages = 0
+        self.started = 0
+        self.last_activity = 0
+        self.ended = False
+        self.topics: Dict[str, int] = {}
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "partner": self.partner,
+            "messages": self.messages,
+            "started": self.started,
+            "lastActivity": self.last_activity,
+            "ended": self.ended,
+            "topics": dict(self.topics)
+        }
+
+    @classmethod
+    def from_json(cls, raw: Dict[str, Any]) -> "ConversationAggregate":
+        agg = cls(raw.get("partner"))
+        agg.messages = int(raw.get("messages", 0) or 0)
+        agg.started = int(raw.get("started", 0) or 0)
+        agg.last_activity = int(raw.get("lastActivity", 0) or 0)
+        agg.ended = bool(raw.get("ended", False))
+        agg.topics = {str(k): int(v) for k, v in (raw.get("topics") or {}).items()}
+        return agg
+
+
+class EpisodeAggregator:
+    """Folds episodes evicted from the ring buffer into per-partner and per-conversation aggregates."""
+
+    def __init__(self, max_partners: int = 256, max_conversations: int = 64):
+        self.max_partners = max(1, int(max_partners))
+        self.max_conversations = max(1, int(max_conversations))
+        self.partners: "OrderedDict[str, PartnerAggregate]" = OrderedDict()
+        self.conversations: "OrderedDict[str, ConversationAggregate]" = OrderedDict()
+        self.folded = 0
+
+    def _partner(self, partner_id: str) -> PartnerAggregate:
+        agg = self.partners.pop(partner_id, None) or PartnerAggregate()
+        # Most recently touched last, so the least recent partner is evicted first.
+        self.partners[sys.intern(partner_id)] = agg
+        while len(self.partners) > self.max_partners:
+            self.partners.popitem(last=False)
+        return agg
+
+    def _conversation(self, conv_id: str, partner: Optional[str]) -> ConversationAggregate:
+        agg = self.conversations.pop(conv_id, None) or ConversationAggregate(partner)
+        if partner and not agg.partner:
+            agg.partner = partner
+        self.conversations[sys.intern(conv_id)] = agg
+        while len(self.conversations) > self.max_conversations:
+            self.conversations.popitem(last=False)
+        return agg
+
+    def fold(self, episode: Episode, self_id: Optional[str], score: Callable[[str], Tuple[float, float]]) -> None:
+        """Fold one episode in O(message length); called once per eviction."""
+        data = episode.data
+        conv_id = data.get("conversationId")
+        sender = data.get("from")
+        partner = sender if sender and sender != self_id else data.get("with")
+        conv = None
+        if conv_id:
+            conv = self._conversation(str(conv_id), partner if partner != self_id else None)
+            partner = partner or conv.partner
+            conv.last_activity = max(conv.last_activity, episode.timestamp)
+            if episode.type == "conversation_started" and not conv.started:
+                conv.started = episode.timestamp
+            elif episode.type == "conversation_ended":
+                conv.ended = True
+        self.folded += 1
+        message = data.get("message")
+        message = message if isinstance(message, str) else ""
+        if conv is not None and message:
+            conv.messages += 1
+            _add_topics(conv.topics, message)
+        if not partner or partner == self_id:
+            return
+        agg = self._partner(str(partner))
+        agg.touch(episode.timestamp)
+        if episode.type == "conversation_started":
+            agg.conversations += 1
+        if not message:
+            return
+        _add_topics(agg.topics, message)
+        if sender and sender != self_id:
+            agg.messages_in += 1
+            polarity, confidence = score(message)
+            if confidence > 0:
+                agg.add_sentiment(polarity)
+        else:
+            agg.messages_out += 1
+
+    def summaries(self, limit: int = 5) -> List[Dict[str, Any]]:
+        """Dense per-partner summaries for prompts, most recent contact first."""
+        recent = sorted(self.partners.items(), key=lambda item: -item[1].last_contact)[:limit]
+        return [agg.summary(partner_id) for partner_id, agg in recent]
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "folded": self.folded,
+            "partners": {key: agg.to_json() for key, agg in self.partners.items()},
+            "conversations": {key: agg.to_json() for key, agg in self.conversations.items()}
+        }
+
+    @classmethod
+    def from_json(cls, raw: Any) -> "EpisodeAggregator":
+        aggregator = cls()
+        if not isinstance(raw, dict):
+            return aggregator
+        aggregator.folded = int(raw.get("folded", 0) or 0)
+        for key, value in (raw.get("partners") or {}).items():
+            if isinstance(value, dict):
+                aggregator.partners[sys.intern(str(key))] = PartnerAggregate.from_json(value)
+        for key, value in (raw.get("conversations") or {}).items():
+            if isinstance(value, dict):
+                aggregator.conversations[sys.intern(str(key))] = ConversationAggregate.from_json(value)
+        return aggregator
@@ -0,0 +1,103 @@
+import heapq
+import math
+import re
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from sentiment_lexicon import fold
+
+TOKEN_RE = re.compile(r"[a-z0-9]{3,}")
+# Episode data fields whose values are worth matching on besides the message text.
+TEXT_FIELDS = ("message", "from", "with", "jobId", "buildingId", "eventId", "name", "note")
+
+
+def _tokens(text: str) -> List[str]:
+    return TOKEN_RE.findall(fold(text))
+
+
+class EpisodeIndex:
+    """Incremental hashing-trick TF-IDF index over recent episodes with cosine top-k retrieval.
+
+    Documents are sparse ``{bucket: weight}`` vectors kept in an inverted index, so adding or
+    evicting one costs O(tokens) and a query only touches postings of its own buckets.
+    """
+
+    def __init__(self, capacity: int = 512, dim: int = 4096):
+        self.capacity = max(1, int(capacity))
+        self.dim = max(16, int(dim))
+        self._docs: Dict[int, Tuple[Any, Dict[int, float]]] = {}
+        self._postings: Dict[int, Dict[int, float]] = {}
+        self._next = 0
+        self.metrics: Dict[str, Any] = {"indexed": 0, "queries": 0, "hits": 0}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def _vector(self, text: str) -> Dict[int, float]:
+        counts: Dict[int, int] = {}
+        for token in _tokens(text):
+            bucket = zlib.crc32(token.encode("utf-8")) % self.dim
+            counts[bucket] = counts.get(bucket, 0) + 1
+        return {bucket: 1.0 + math.log(count) for bucket, count in counts.items()}
+
+    @staticmethod
+    def episode_text(kind: str, data: Dict[str, Any]) -> str:
+        parts = [kind.replace("_", " ")]
+        parts.extend(str(data[field]) for field in TEXT_FIELDS if data.get(field))
+        return " ".join(parts)
+
+    def add(self, item: Any, text: str) -> None:
+        """Index ``item`` under ``text``; the oldest document is evicted past capacity."""
+        vector = self._vector(text)
+        if not vector:
+            return
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        vector = {bucket: weight / norm for bucket, weight in vector.items()}
+        doc_id = self._next
+        self._next += 1
+        self._docs[doc_id] = (item, vector)
+        for bucket, weight in vector.items():
+            self._postings.setdefault(bucket, {})[doc_id] = weight
+        evicted = doc_id - self.capacity
+        if evicted in self._docs:
+            self._remove(evicted)
+        self.metrics["indexed"] += 1
+
+    def _remove(self, doc_id: int) -> None:
+        _, vector = self._docs.pop(doc_id)
+        for bucket in vector:
+            posting = self._postings.get(bucket)
+            if posting is None:
+                continue
+            posting.pop(doc_id, None)
+            if not posting:
+                del self._postings[bucket]
+
+    def query(self, text: str, k: int = 4, min_score: float = 0.1, exclude: Optional[set] = None) -> List[Tuple[Any, float]]:
+        """Top ``k`` indexed items by cosine similarity to ``text`` (IDF-weighted query)."""
+        self.metrics["queries"] += 1
+        vector = self._vector(text)
+        total = len(self._docs)
+        if not vector or not total:
+            return []
+        weighted: Dict[int, float] = {}
+        for bucket, weight in vector.items():
+            df = len(self._postings.get(bucket, ()))
+            if df:
+                weighted[bucket] = weight * (math.log((1 + total) / (1 + df)) + 1.0)
+        norm = math.sqrt(sum(weight * weight for weight in weighted.values())) or 1.0
+        scores: Dict[int, float] = {}
+        for bucket, weight in weighted.items():
+            for doc_id, doc_weight in self._postings[bucket].items():
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight / norm * doc_weight
+        best = heapq.nlargest(k + len(exclude or ()), scores.items(), key=lambda item: item[1])
+        results = []
+        for doc_id, score in best:
+            item = self._docs[doc_id][0]
+            if score < min_score or (exclude and id(item) in exclude):
+                continue
+            results.append((item, round(score, 4)))
+            if len(results) >= k:
+                break
+        self.metrics["hits"] += len(results)
+        return results
@@ -0,0 +1,142 @@
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _apply_episode(memory: Dict[str, Any], data: Dict[str, Any], limit: Optional[int]) -> None:
+    episodes = memory.setdefault("episodes", [])
+    episodes.append(data)
+    if limit is not None and len(episodes) > limit:
+        del episodes[:len(episodes) - limit]
+
+
+def _apply_relationship(memory: Dict[str, Any], data: Dict[str, Any], limit: Optional[int]) -> None:
+    other_id = data.get("id")
+    if other_id:
+        memory.setdefault("relationships", {})[other_id] = data.get("record", {})
+
+
+class MemoryJournal:
+    """Append-only JSONL journal of episode and relationship updates on top of a memory snapshot.
+
+    Appends happen on the event loop and compaction in the memory writer's worker thread; a lock
+    keeps a line appended mid-compaction from landing in the file being replaced.
+    """
+
+    APPLY: Dict[str, Callable[[Dict[str, Any], Dict[str, Any], Optional[int]], None]] = {
+        "episode": _apply_episode,
+        "relationship": _apply_relationship
+    }
+
+    def __init__(self, path: Path, episode_limit: int = 80):
+        self.path = path
+        self.episode_limit = episode_limit
+        self.seq = 0
+        self.pending = 0
+        self.bytes = 0
+        self._handle = None
+        # Lines not yet folded into a snapshot, kept so compaction can keep the ones a write missed.
+        self._tail: List[Tuple[int, str]] = []
+        self._lock = threading.Lock()
+
+    def replay(self, memory: Dict[str, Any], bounded: bool = True) -> int:
+        """Apply entries newer than the snapshot's ``journalSeq`` to ``memory``; returns how many were applied.
+
+        With ``bounded=False`` every replayed episode is kept, so a caller merging into a ring
+        buffer sees (and can fold) the ones that fall out of it.
+        """
+        limit = self.episode_limit if bounded else None
+        snapshot_seq = int(memory.get("journalSeq", 0) or 0)
+        self.seq = snapshot_seq
+        if not self.path.exists():
+            return 0
+        applied = 0
+        valid_bytes = 0
+        try:
+            with self.path.open("rb") as handle:
+                for raw in handle:
+                    if not raw.endswith(b"\n"):
+                        break
+                    try:
+                        entry = json.loads(raw)
+                    except ValueError:
+                        break
+                    valid_bytes += len(raw)
+                    seq = int(entry.get("seq", 0))
+                    if seq <= snapshot_seq:
+                        continue
+                    self._tail.append((seq, raw.decode("utf-8")))
+                    apply = self.APPLY.get(entry.get("op"))
+                    if apply and isinstance(entry.get("data"), dict):
+                        apply(memory, entry["data"], limit)
+                        applied += 1
+                    self.seq = max(self.seq, seq)
+            if valid_bytes < self.path.stat().st_size:
+                # A crash mid-append leaves a torn last line; drop it so new entries start clean.
+                logger.warning("Truncating torn memory journal tail at byte %s", valid_bytes)
+                with self.path.open("r+b") as handle:
+                    handle.truncate(valid_bytes)
+        except OSError as error:
+            logger.warning(f"Failed to replay memory journal: {error}")
+        self.pending = applied
+        self.bytes = valid_bytes
+        memory["journalSeq"] = self.seq
+        return applied
+
+    def append(self, op: str, data: Dict[str, Any]) -> Optional[int]:
+        with self._lock:
+            self.seq += 1
+            line = json.dumps({"seq": self.seq, "op": op, "data": data}, ensure_ascii=False) + "\n"
+            try:
+                if self._handle is None:
+                    self._handle = self.path.open("a", encoding="utf-8")
+                self._handle.write(line)
+                self._handle.flush()
+            except OSError as error:
+                logger.warning(f"Failed to append to memory journal: {error}")
+                return None
+            self._tail.append((self.seq, line))
+            self.pending += 1
+            self.bytes += len(line.encode("utf-8"))
+            return self.seq
+
+    def compact_through(self, seq: int) -> None:
+        """Drop entries up to ``seq`` once a snapshot that includes them is safely on disk."""
+        with self._lock:
+            keep = [(entry_seq, line) for entry_seq, line in self._tail if entry_seq > seq]
+            self._close()
+            try:
+                write_snapshot(self.path, "".join(line for _, line in keep))
+            except OSError as error:
+                logger.warning(f"Failed to compact memory journal: {error}")
+                return
+            self._tail = keep
+            self.pending = len(keep)
+            self.bytes = sum(len(line.encode("utf-8")) for _, line in keep)
+
+    def _close(self) -> None:
+        if self._handle is not None:
+            try:
+                self._handle.close()
+            except OSError:
+                pass
+            self._handle = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+
+def write_snapshot(path: Path, payload: str) -> None:
+    """Atomically replace ``path`` with ``payload`` (write a sibling temp file, fsync, rename)."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tmp_path.open("w", encoding="utf-8") as handle:
+        handle.write(payload)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp_path, path)
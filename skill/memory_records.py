@@ -0,0 +1,149 @@
+import sys
+from collections import deque
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+# Episode data fields holding agent/conversation ids; interned so repeated ids share one string.
+ID_FIELDS = ("from", "with", "conversationId", "speakerId")
+RELATIONSHIP_KEYS = ("affinity", "trust", "respect", "lastNote", "lastMessage")
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class Episode:
+    """One long-memory episode; ``data`` stays a free-form dict per episode type."""
+
+    __slots__ = ("type", "data", "timestamp")
+
+    def __init__(self, kind: str, data: Dict[str, Any], timestamp: int):
+        self.type = sys.intern(str(kind))
+        for field in ID_FIELDS:
+            if field in data:
+                data[field] = _intern(data[field])
+        self.data = data
+        self.timestamp = int(timestamp or 0)
+
+    @classmethod
+    def from_json(cls, raw: Dict[str, Any]) -> "Episode":
+        data = raw.get("data")
+        return cls(raw.get("type", ""), dict(data) if isinstance(data, dict) else {}, raw.get("timestamp", 0))
+
+    def to_json(self) -> Dict[str, Any]:
+        return {"type": self.type, "data": self.data, "timestamp": self.timestamp}
+
+
+class Relationship:
+    """Affinity/trust/respect towards one agent. Replaced, never mutated, so snapshots can share it."""
+
+    __slots__ = ("affinity", "trust", "respect", "last_note", "last_message", "extra")
+
+    def __init__(
+        self,
+        affinity: int = 0,
+        trust: int = 0,
+        respect: int = 0,
+        last_note: str = "",
+        last_message: str = "",
+        extra: Optional[Dict[str, Any]] = None
+    ):
+        self.affinity = affinity
+        self.trust = trust
+        self.respect = respect
+        self.last_note = last_note
+        self.last_message = last_message
+        # Keys written by older versions are carried through untouched.
+        self.extra = extra or None
+
+    @property
+    def score(self) -> int:
+        return self.affinity + self.trust + self.respect
+
+    @classmethod
+    def from_json(cls, raw: Dict[str, Any]) -> "Relationship":
+        if not isinstance(raw, dict):
+            return cls()
+        extra = {key: value for key, value in raw.items() if key not in RELATIONSHIP_KEYS}
+        return cls(
+            int(raw.get("affinity", 0) or 0),
+            int(raw.get("trust", 0) or 0),
+            int(raw.get("respect", 0) or 0),
+            str(raw.get("lastNote", "") or ""),
+            str(raw.get("lastMessage", "") or ""),
+            extra
+        )
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            **(self.extra or {}),
+            "affinity": self.affinity,
+            "trust": self.trust,
+            "respect": self.respect,
+            "lastNote": self.last_note,
+            "lastMessage": self.last_message
+        }
+
+
+class Utterance:
+    __slots__ = ("speaker_id", "message", "timestamp")
+
+    def __init__(self, speaker_id: str, message: str, timestamp: int):
+        self.speaker_id = sys.intern(speaker_id)
+        self.message = message
+        self.timestamp = timestamp
+
+    def to_json(self) -> Dict[str, Any]:
+        return {"speakerId": self.speaker_id, "message": self.message, "timestamp": self.timestamp}
+
+
+class RingBuffer:
+    """Fixed-capacity buffer; appending past capacity drops the oldest item without copying."""
+
+    __slots__ = ("_items",)
+
+    def __init__(self, capacity: int, items: Iterable[Any] = ()):
+        self._items: deque = deque(items, maxlen=max(1, int(capacity)))
+
+    @property
+    def capacity(self) -> int:
+        return self._items.maxlen
+
+    def append(self, item: Any) -> Optional[Any]:
+        """Append ``item``; returns the evicted oldest item, if any."""
+        evicted = self._items[0] if len(self._items) == self._items.maxlen else None
+        self._items.append(item)
+        return evicted
+
+    def tail(self, count: int) -> List[Any]:
+        count = max(0, min(int(count), len(self._items)))
+        return list(islice(self._items, len(self._items) - count, None))
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._items)
+
+    def to_json(self) -> List[Any]:
+        return list(self._items)
+
+
+def detach(value: Any) -> Any:
+    """Deep copy of ``value`` as plain JSON data, so another thread can serialize it while the loop mutates the original."""
+    convert = getattr(value, "to_json", None)
+    if callable(convert):
+        value = convert()
+    if isinstance(value, dict):
+        return {key: detach(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [detach(item) for item in value]
+    return value
+
+
+def to_json(value: Any) -> Any:
+    """``json.dumps(default=...)`` hook for the record types above (and anything else with ``to_json``)."""
+    convert = getattr(value, "to_json", None)
+    if callable(convert):
+        return convert()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,159 @@
+import json
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+# First key of a sectioned memory file. The file stays one valid JSON object, but its first line
+# maps every section to (offset, length) of its value, counted from the start of the second line.
+HEADER_KEY = "_sections"
+HEADER_PREFIX = b'{"' + HEADER_KEY.encode("ascii") + b'":'
+# Sections that are parsed only when first accessed; the rest is needed right away by __init__.
+COLD_SECTIONS = ("episodes", "notes", "aggregates")
+
+
+class RawSection(str):
+    """JSON text of a section that was never parsed; written back verbatim."""
+
+
+class SectionedMemory(dict):
+    """Long-memory dict whose cold sections are parsed (and hydrated) on first access."""
+
+    def __init__(self, hot: Dict[str, Any], cold: Dict[str, Tuple[Optional[bytes], Callable[[Optional[bytes]], Any]]]):
+        super().__init__(hot)
+        self._cold = cold
+        self.loaded_lazily = 0
+
+    def _load(self, key: str) -> None:
+        pending = self._cold.pop(key, None)
+        if pending is not None:
+            raw, loader = pending
+            dict.__setitem__(self, key, loader(raw))
+            self.loaded_lazily += 1
+
+    def load_all(self) -> None:
+        for key in list(self._cold):
+            self._load(key)
+
+    @property
+    def unloaded(self) -> Tuple[str, ...]:
+        return tuple(self._cold)
+
+    def __missing__(self, key: str) -> Any:
+        if key in self._cold:
+            self._load(key)
+            return dict.__getitem__(self, key)
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        self._load(key)
+        return dict.get(self, key, default)
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        self._load(key)
+        return dict.setdefault(self, key, default)
+
+    def pop(self, key: str, *default: Any) -> Any:
+        self._load(key)
+        return dict.pop(self, key, *default)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._cold.pop(key, None)
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key: str) -> None:
+        self._cold.pop(key, None)
+        dict.__delitem__(self, key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._cold or dict.__contains__(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        self.load_all()
+        return dict.__iter__(self)
+
+    def __len__(self) -> int:
+        return dict.__len__(self) + len(self._cold)
+
+    def keys(self):
+        self.load_all()
+        return dict.keys(self)
+
+    def values(self):
+        self.load_all()
+        return dict.values(self)
+
+    def items(self):
+        self.load_all()
+        return dict.items(self)
+
+    def raw_items(self) -> Iterator[Tuple[str, Any]]:
+        """Loaded sections as values, unparsed ones as ``RawSection`` text, without loading anything."""
+        yield from dict.items(self)
+        for key, (raw, _) in list(self._cold.items()):
+            if raw is not None:
+                yield key, RawSection(raw.decode("ascii"))
+
+
+def encode_sections(memory: Dict[str, Any], default: Optional[Callable[[Any], Any]] = None) -> str:
+    """Serialize ``memory`` as a sectioned (but still valid) JSON object."""
+    parts = []
+    offsets: Dict[str, Tuple[int, int]] = {}
+    position = 0
+    items = [(key, value) for key, value in memory.items() if key != HEADER_KEY]
+    for index, (key, value) in enumerate(items):
+        # ensure_ascii keeps character offsets equal to byte offsets.
+        value_text = value if isinstance(value, RawSection) else json.dumps(value, default=default, separators=(",", ":"))
+        prefix = json.dumps(key) + ":"
+        suffix = ",\n" if index < len(items) - 1 else "\n"
+        offsets[key] = (position + len(prefix), len(value_text))
+        parts.append(prefix + value_text + suffix)
+        position += len(prefix) + len(value_text) + len(suffix)
+    header = HEADER_PREFIX.decode("ascii") + json.dumps(offsets, separators=(",", ":")) + (",\n" if items else "\n")
+    return header + "".join(parts) + "}\n"
+
+
+def decode_sections(
+    data: bytes,
+    hydrate: Callable[[str, Any], Any],
+    hydrated_keys: Tuple[str, ...] = (),
+    cold: Tuple[str, ...] = COLD_SECTIONS
+) -> Optional[SectionedMemory]:
+    """Parse only the hot sections of a sectioned file; None if ``data`` is plain JSON.
+
+    ``hydrate(key, value)`` turns a parsed section into its in-memory form. Keys in
+    ``hydrated_keys`` always get hydrated (from None when missing from the file).
+    """
+    if not data.startswith(HEADER_PREFIX):
+        return None
+    newline = data.find(b"\n")
+    try:
+        header = json.loads(data[len(HEADER_PREFIX):newline].rstrip(b","))
+    except ValueError:
+        return None
+    body = newline + 1
+    for key, (offset, length) in header.items():
+        # A hand-edited file no longer matches its offsets; the caller then parses it whole.
+        prefix = (json.dumps(key) + ":").encode("ascii")
+        start = body + offset
+        if newline < 0 or data[start - len(prefix):start] != prefix or data[start + length:start + length + 1] not in (b",", b"\n"):
+            return None
+    hot: Dict[str, Any] = {}
+    lazy: Dict[str, Tuple[Optional[bytes], Callable[[Optional[bytes]], Any]]] = {}
+
+    def loader(key: str) -> Callable[[Optional[bytes]], Any]:
+        def load(raw: Optional[bytes]) -> Any:
+            value = json.loads(raw) if raw is not None else None
+            return hydrate(key, value) if key in hydrated_keys else value
+        return load
+
+    for key, (offset, length) in header.items():
+        raw = data[body + offset:body + offset + length]
+        if key in cold:
+            lazy[key] = (raw, loader(key))
+        else:
+            hot[key] = loader(key)(raw)
+    for key in hydrated_keys:
+        if key not in header:
+            if key in cold:
+                lazy[key] = (None, loader(key))
+            else:
+                hot[key] = hydrate(key, None)
+    return SectionedMemory(hot, lazy)
@@ -0,0 +1,176 @@
+import json
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS episodes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    counterpart TEXT,
+    conversation_id TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS episodes_ts ON episodes (ts);
+CREATE INDEX IF NOT EXISTS episodes_type_ts ON episodes (type, ts);
+CREATE INDEX IF NOT EXISTS episodes_counterpart_ts ON episodes (counterpart, ts);
+CREATE INDEX IF NOT EXISTS episodes_conversation_ts ON episodes (conversation_id, ts);
+CREATE TABLE IF NOT EXISTS relationships (
+    agent_id TEXT PRIMARY KEY,
+    record TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# Keys stored as their own tables; everything else in long memory is a state blob.
+TABLE_KEYS = ("episodes", "relationships")
+UTTERANCE_TYPES = ("conversation_message", "heard_speech")
+
+# Fixed statements so sqlite3's statement cache reuses the prepared queries.
+INSERT_EPISODE = "INSERT INTO episodes (ts, type, counterpart, conversation_id, data) VALUES (?, ?, ?, ?, ?)"
+UPSERT_RELATIONSHIP = "INSERT OR REPLACE INTO relationships (agent_id, record) VALUES (?, ?)"
+UPSERT_STATE = "INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)"
+SELECT_RECENT = "SELECT data FROM episodes ORDER BY id DESC LIMIT ?"
+SELECT_RECENT_BY_TYPE = "SELECT data FROM episodes WHERE type = ? ORDER BY ts DESC, id DESC LIMIT ?"
+SELECT_UTTERANCES_FROM = (
+    "SELECT data FROM episodes WHERE counterpart = ? AND type IN (?, ?) ORDER BY ts DESC, id DESC LIMIT ?"
+)
+SELECT_CONVERSATION = "SELECT data FROM episodes WHERE conversation_id = ? ORDER BY ts DESC, id DESC LIMIT ?"
+PRUNE_EPISODES = "DELETE FROM episodes WHERE id <= (SELECT MAX(id) FROM episodes) - ?"
+
+
+def _counterpart(data: Dict[str, Any]) -> Optional[str]:
+    value = data.get("from") or data.get("with")
+    return str(value) if value else None
+
+
+class MemoryStore:
+    """SQLite long-term memory: indexed episodes, relationship rows and JSON state blobs."""
+
+    def __init__(self, path: Path, max_episodes: int = 50000):
+        self.path = path
+        self.max_episodes = max(1, int(max_episodes))
+        # The memory writer saves state blobs from a worker thread; one lock serializes all access.
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._inserts = 0
+        self.metrics: Dict[str, Any] = {"episodes": 0, "relationships": 0, "stateWrites": 0, "queries": 0, "migrated": False}
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT (SELECT COUNT(*) FROM episodes) + (SELECT COUNT(*) FROM relationships) + (SELECT COUNT(*) FROM state)"
+            ).fetchone()
+        return not row[0]
+
+    def migrate(self, memory: Dict[str, Any]) -> None:
+        """Import a ``memory.json``-style dict in one transaction."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for entry in memory.get("episodes", []) or []:
+                    if isinstance(entry, dict):
+                        self._insert_episode(entry)
+                for other_id, record in (memory.get("relationships") or {}).items():
+                    self._conn.execute(UPSERT_RELATIONSHIP, (other_id, json.dumps(record, ensure_ascii=False)))
+                self._save_state(memory)
+                self._conn.execute("COMMIT")
+            except sqlite3.Error:
+                self._conn.execute("ROLLBACK")
+                raise
+        self.metrics["migrated"] = True
+
+    def load(self, episode_limit: int = 80) -> Dict[str, Any]:
+        """The in-memory view: recent episodes (oldest first), all relationships and state blobs."""
+        memory: Dict[str, Any] = {"episodes": self.recent_episodes(episode_limit), "relationships": {}}
+        with self._lock:
+            for agent_id, record in self._conn.execute("SELECT agent_id, record FROM relationships"):
+                memory["relationships"][agent_id] = json.loads(record)
+            for key, value in self._conn.execute("SELECT key, value FROM state"):
+                memory[key] = json.loads(value)
+        return memory
+
+    def _insert_episode(self, entry: Dict[str, Any]) -> None:
+        data = entry.get("data") if isinstance(entry.get("data"), dict) else {}
+        conv_id = data.get("conversationId")
+        self._conn.execute(INSERT_EPISODE, (
+            int(entry.get("timestamp", 0) or 0),
+            str(entry.get("type", "")),
+            _counterpart(data),
+            str(conv_id) if conv_id else None,
+            json.dumps(entry, ensure_ascii=False)
+        ))
+
+    def add_episode(self, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._insert_episode(entry)
+            self._inserts += 1
+            if self._inserts % 500 == 0:
+                self._conn.execute(PRUNE_EPISODES, (self.max_episodes,))
+        self.metrics["episodes"] += 1
+
+    def put_relationship(self, other_id: str, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self._conn.execute(UPSERT_RELATIONSHIP, (other_id, json.dumps(record, ensure_ascii=False)))
+        self.metrics["relationships"] += 1
+
+    def _save_state(self, memory: Dict[str, Any]) -> int:
+        size = 0
+        for key, value in memory.items():
+            if key in TABLE_KEYS or key == "journalSeq":
+                continue
+            blob = json.dumps(value, ensure_ascii=False)
+            size += len(blob)
+            self._conn.execute(UPSERT_STATE, (key, blob))
+        return size
+
+    def save_state(self, memory: Dict[str, Any]) -> int:
+        """Write every non-table key of ``memory`` as a blob; returns the bytes written."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                size = self._save_state(memory)
+                self._conn.execute("COMMIT")
+            except sqlite3.Error:
+                self._conn.execute("ROLLBACK")
+                raise
+        self.metrics["stateWrites"] += 1
+        return size
+
+    def _query(self, sql: str, params: tuple) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        self.metrics["queries"] += 1
+        return [json.loads(row[0]) for row in reversed(rows)]
+
+    def recent_episodes(self, limit: int = 80, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        if kind is None:
+            return self._query(SELECT_RECENT, (int(limit),))
+        return self._query(SELECT_RECENT_BY_TYPE, (kind, int(limit)))
+
+    def utterances_from(self, speaker_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Last ``limit`` things ``speaker_id`` said (conversation messages and overheard speech), oldest first."""
+        return self._query(SELECT_UTTERANCES_FROM, (speaker_id, *UTTERANCE_TYPES, int(limit)))
+
+    def conversation_episodes(self, conv_id: str, limit: int = 50) -> List[Dict[str, Any]]:
+        return self._query(SELECT_CONVERSATION, (conv_id, int(limit)))
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self._conn.execute("SELECT COUNT(*) FROM episodes").fetchone()[0]
+        return {**self.metrics, "storedEpisodes": total}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,145 @@
+import asyncio
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from memory_journal import write_snapshot
+from memory_records import to_json
+from memory_sections import encode_sections
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryWriter:
+    """Write-behind persistence: coalesces save requests and writes snapshots from a worker thread.
+
+    ``snapshot`` is called on the loop and must return a deep copy; ``after_write`` runs in the
+    worker right after a successful write.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        snapshot: Callable[[], Dict[str, Any]],
+        after_write: Optional[Callable[[Dict[str, Any]], None]] = None,
+        debounce_sec: float = 2.0,
+        write: Optional[Callable[[Dict[str, Any]], int]] = None
+    ):
+        self.path = path
+        self._snapshot = snapshot
+        self._custom_write = write
+        self._after_write = after_write
+        self.debounce_sec = max(0.0, float(debounce_sec))
+        self._dirty_since: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self.metrics: Dict[str, Any] = {
+            "requested": 0,
+            "coalesced": 0,
+            "writes": 0,
+            "failures": 0,
+            "bytes": 0,
+            "lastLagMs": 0.0,
+            "maxLagMs": 0.0,
+            "lastWriteMs": 0.0
+        }
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty_since is not None
+
+    def mark_dirty(self) -> None:
+        self.metrics["requested"] += 1
+        if self._dirty_since is None:
+            self._dirty_since = time.perf_counter()
+        else:
+            self.metrics["coalesced"] += 1
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # No loop yet (startup) or already gone (shutdown): write inline.
+            self.flush_sync()
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.debounce_sec)
+        await self.flush()
+
+    def _write(self, snapshot: Dict[str, Any]) -> int:
+        """Runs in the worker thread; ``snapshot`` must already be detached from live memory."""
+        if self._custom_write is not None:
+            size = self._custom_write(snapshot)
+        else:
+            payload = encode_sections(snapshot, default=to_json)
+            write_snapshot(self.path, payload)
+            size = len(payload)
+        if self._after_write:
+            self._after_write(snapshot)
+        return size
+
+    def _finish(self, size: int, started: float, dirty_since: float) -> None:
+        now = time.perf_counter()
+        lag_ms = (now - dirty_since) * 1000
+        self.metrics["writes"] += 1
+        self.metrics["bytes"] = size
+        self.metrics["lastLagMs"] = round(lag_ms, 2)
+        self.metrics["maxLagMs"] = round(max(self.metrics["maxLagMs"], lag_ms), 2)
+        self.metrics["lastWriteMs"] = round((now - started) * 1000, 2)
+
+    async def flush(self) -> bool:
+        """Write now if dirty. Returns False when the write failed (memory stays dirty)."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._dirty_since is None:
+                return True
+            dirty_since = self._dirty_since
+            self._dirty_since = None
+            snapshot = self._snapshot()
+            started = time.perf_counter()
+            try:
+                size = await asyncio.get_running_loop().run_in_executor(None, self._write, snapshot)
+            except (OSError, RuntimeError, TypeError, ValueError, sqlite3.Error) as error:
+                self.metrics["failures"] += 1
+                logger.warning(f"Failed to save long memory: {error}")
+                if self._dirty_since is None:
+                    self._dirty_since = dirty_since
+                return False
+            self._finish(size, started, dirty_since)
+            return True
+
+    def flush_sync(self) -> bool:
+        """Blocking flush for shutdown paths where no event loop can run the worker."""
+        if self._dirty_since is None:
+            return True
+        dirty_since = self._dirty_since
+        self._dirty_since = None
+        snapshot = self._snapshot()
+        started = time.perf_counter()
+        try:
+            size = self._write(snapshot)
+        except (OSError, RuntimeError, TypeError, ValueError, sqlite3.Error) as error:
+            self.metrics["failures"] += 1
+            logger.warning(f"Failed to save long memory: {error}")
+            self._dirty_since = dirty_since
+            return False
+        self._finish(size, started, dirty_since)
+        return True
+
+    async def close(self) -> None:
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        await self.flush()
+
+    def snapshot_metrics(self) -> Dict[str, Any]:
+        pending_ms = (time.perf_counter() - self._dirty_since) * 1000 if self._dirty_since is not None else 0.0
+        return {**self.metrics, "dirty": self.dirty, "pendingMs": round(pending_ms, 2)}
@@ -4,6 +4,7 @@ MOLTVILLE Skill for OpenClaw
 Connects Moltbot to MOLTVILLE virtual city
 """
 
+import atexit
 import json
 import asyncio
 import socketio
@@ -13,12 +14,36 @@ from pathlib import Path
 from collections import deque
 import logging
 import random
+import sqlite3
+import sys
 import time
+from action_locks import ResourceLocks, action_resources
+from action_tracker import ActionTracker, perceived_effect
+from cycle_deadline import bounded, cycle_deadline, expired, remaining
+from decision_scheduler import DecisionScheduler
+from llm_backends import BackendPool
+from memory_aggregates import EpisodeAggregator
+from intent_queue import ActionIntentQueue
+from memory_index import EpisodeIndex
+from memory_journal import MemoryJournal
+from memory_records import Episode, Relationship, RingBuffer, Utterance, detach
+from memory_sections import HEADER_KEY, RawSection, SectionedMemory, decode_sections
+from memory_store import TABLE_KEYS, MemoryStore
+from memory_writer import MemoryWriter
+from llm_schemas import ACTION_TYPES, SCHEMAS, action_schema
+from llm_scheduler import LLMScheduler
+from llm_telemetry import LLMTelemetry
+from prompt_assembly import PERSONA_KEYS, ConversationHistory, render_payload
+from relationship_matrix import RelationshipMatrix
+from sentiment_lexicon import LexiconScorer
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Long-memory sections kept as records in memory rather than as their JSON form.
+HYDRATED_SECTIONS = ("episodes", "relationships", "aggregates")
+
 class MOLTVILLESkill:
     """
     MOLTVILLE Skill - Enables Moltbot to live in a virtual city
@@ -39,11 +64,61 @@ class MOLTVILLESkill:
         self.current_state = {}
         self._auto_task: Optional[asyncio.Task] = None
         self._decision_task: Optional[asyncio.Task] = None
+        self._decision_inflight: Optional[asyncio.Task] = None
+        self._decision_inflight_since = 0.0
+        self._decision_preempted = False
+        self._decision_generation = 0
+        behavior_cfg = self.config.get("behavior", {}) if isinstance(self.config.get("behavior"), dict) else {}
+        loop_cfg = behavior_cfg.get("decisionLoop", {}) if isinstance(behavior_cfg.get("decisionLoop"), dict) else {}
+        if loop_cfg.get("enabled", False):
+            base_interval_sec = max(float(loop_cfg.get("intervalMs", 20000)) / 1000, 2)
+        else:
+            # Auto-explore paces itself with the legacy decisionInterval.
+            base_interval_sec = max(float(behavior_cfg.get("decisionInterval", 30000)) / 1000, 1)
+        max_interval_ms = loop_cfg.get("maxIntervalMs")
+        self._decision_scheduler = DecisionScheduler(
+            base_interval_sec,
+            max_interval_sec=float(max_interval_ms) / 1000 if isinstance(max_interval_ms, (int, float)) else None,
+            min_spacing_sec=float(loop_cfg.get("minSpacingMs", 2000)) / 1000,
+            backoff=float(loop_cfg.get("backoffFactor", 1.6))
+        )
+        self._preempt_metrics: Dict[str, Any] = {"preempted": 0, "preemptedMs": 0.0, "stale": 0, "wakeups": 0, "byReason": {}}
         self._active_goals: List[Dict[str, Any]] = []
         self._conversation_state: Dict[str, str] = {}
-        self._recent_utterances: List[Dict[str, Any]] = []
+        self._recent_utterances = RingBuffer(12)
         self.long_memory_path = Path(__file__).parent / "memory.json"
+        memory_cfg = self.config.get("memory", {}) if isinstance(self.config.get("memory"), dict) else {}
+        self._journal = MemoryJournal(self.long_memory_path.with_name("memory.journal.jsonl"))
+        self._journal_compact_entries = max(1, int(memory_cfg.get("compactEvery", 200)))
+        self._journal_compact_bytes = max(4096, int(memory_cfg.get("compactBytes", 256 * 1024)))
+        self._memory_store = self._init_memory_store(memory_cfg)
+        self._memory_writer = MemoryWriter(
+            self.long_memory_path,
+            self._memory_snapshot,
+            # Compaction rewrites and fsyncs the journal, so it runs in the same worker job as the snapshot.
+            after_write=None if self._memory_store else lambda snapshot: self._journal.compact_through(snapshot.get("journalSeq", 0)),
+            debounce_sec=float(memory_cfg.get("writeDebounceSec", 2.0)),
+            write=self._memory_store.save_state if self._memory_store else None
+        )
+        atexit.register(self._memory_writer.flush_sync)
+        # Needed while loading: journal replay folds the episodes it pushes out of the buffer.
+        self._lexicon = LexiconScorer()
         self.long_memory = self._load_long_memory()
+        self._relationship_matrix = RelationshipMatrix()
+        self._relationship_matrix.load(self.long_memory["relationships"])
+        # Live relationships from the latest perception, re-indexed only when a new dict arrives.
+        self._live_relationships = RelationshipMatrix()
+        self._live_relationships_source: Optional[Dict[str, Any]] = None
+        retrieval_cfg = memory_cfg.get("retrieval", {}) if isinstance(memory_cfg.get("retrieval"), dict) else {}
+        self._memory_index: Optional[EpisodeIndex] = None
+        self._recall_top_k = max(1, int(retrieval_cfg.get("topK", 4)))
+        if retrieval_cfg.get("enabled", True):
+            self._memory_index = EpisodeIndex(
+                capacity=int(retrieval_cfg.get("capacity", 512)),
+                dim=int(retrieval_cfg.get("dim", 4096))
+            )
+        # Filled from the remembered episodes on first use, so startup doesn't load them.
+        self._memory_index_primed = False
         self._current_intent: Optional[str] = None
         self._intent_expires_at: Optional[float] = None
         self._traits = self._init_traits()
@@ -60,6 +135,14 @@ class MOLTVILLESkill:
         self._conversation_stale_seconds = 120
         self._relation_update_cooldown = 8
         self._last_relation_update: Dict[str, float] = {}
+        relation_batch_cfg = self.config.get("behavior", {}).get("relationshipBatch", {}) if isinstance(self.config.get("behavior", {}).get("relationshipBatch"), dict) else {}
+        self._relation_batch_window = float(relation_batch_cfg.get("windowSec", self._relation_update_cooldown))
+        self._relation_batch_max = max(1, int(relation_batch_cfg.get("maxMessages", 24)))
+        self._relation_min_confidence = float(relation_batch_cfg.get("minLexiconConfidence", 0.5))
+        self._relation_batch: List[Dict[str, str]] = []
+        self._relation_metrics: Dict[str, int] = {"lexicon": 0, "escalated": 0}
+        self._relation_batch_task: Optional[asyncio.Task] = None
+        self._relation_flush_task: Optional[asyncio.Task] = None
         self._plan_state = self.long_memory.get("planState", {}) if isinstance(self.long_memory, dict) else {}
         self._plan_ttl_seconds = 180
         self._plan_action_timeout = 45
@@ -82,16 +165,47 @@ class MOLTVILLESkill:
         self._last_coord_create_ts: float = 0
         self._coord_state: Dict[str, Any] = {}
         self._decision_lock = asyncio.Lock()
-        self._action_lock = asyncio.Lock()
         self._conversation_lock = asyncio.Lock()
         self._decision_lock_timeout = 8
-        self._action_lock_timeout = 20
+        execution_cfg = self.config.get("behavior", {}).get("actionExecution", {}) if isinstance(self.config.get("behavior", {}).get("actionExecution"), dict) else {}
+        self._action_locks = ResourceLocks(max_concurrent=int(execution_cfg.get("maxConcurrent", 3)))
+        self._action_lock_timeout = float(execution_cfg.get("lockTimeoutSec", 20))
+        tracking_cfg = self.config.get("behavior", {}).get("actionTracking", {}) if isinstance(self.config.get("behavior", {}).get("actionTracking"), dict) else {}
+        self._action_tracker = ActionTracker(
+            confirm_timeout_sec=float(tracking_cfg.get("confirmTimeoutSec", 45)),
+            on_outcome=self._on_action_outcome
+        )
         self._conversation_lock_timeout = 10
+        reply_cfg = self.config.get("behavior", {}).get("conversationReply", {}) if isinstance(self.config.get("behavior", {}).get("conversationReply"), dict) else {}
+        self._reply_debounce = max(0.0, float(reply_cfg.get("debounceSec", 0.6)))
+        self._reply_jobs: Dict[str, asyncio.Task] = {}
+        self._reply_dirty: set = set()
+        self._reply_metrics: Dict[str, int] = {"requested": 0, "coalesced": 0, "runs": 0, "cancelled": 0}
         self._recent_message_hashes: deque = deque(maxlen=24)
         self._health_metrics = self.long_memory.get("healthMetrics", {}) if isinstance(self.long_memory, dict) else {}
-        self._action_queue: List[Dict[str, Any]] = self.long_memory.get("pendingActions", []) if isinstance(self.long_memory, dict) else []
+        arbitration_cfg = self.config.get("behavior", {}).get("arbitrationV2", {}) if isinstance(self.config.get("behavior", {}).get("arbitrationV2"), dict) else {}
+        pending_actions = self.long_memory.get("pendingActions", []) if isinstance(self.long_memory, dict) else []
+        self._action_queue = ActionIntentQueue(
+            items=pending_actions if isinstance(pending_actions, list) else [],
+            max_size=40,
+            default_ttl_sec=int(arbitration_cfg.get("queueTtlSec", 90))
+        )
+        # Queue changes reach memory.json at most once per persist interval.
+        self._queue_persist_sec = max(0.0, float(arbitration_cfg.get("queuePersistSec", 5.0)))
+        self._queue_persisted_at = float("-inf")
+        self._queue_persist_handle: Optional[asyncio.TimerHandle] = None
+        if isinstance(self.long_memory, dict):
+            self.long_memory["pendingActions"] = self._action_queue
         self._http_cfg = self.config.get("http", {}) if isinstance(self.config.get("http"), dict) else {}
         self._job_strategy_state = self.long_memory.get("jobStrategy", {}) if isinstance(self.long_memory, dict) else {}
+        self._llm_scheduler = self._init_llm_scheduler()
+        self._llm_telemetry = self._init_llm_telemetry()
+        self._llm_probe_at: Dict[str, float] = {}
+        self._llm_pools: Dict[Tuple[str, ...], BackendPool] = {}
+        history_cfg = self.config.get("llm", {}).get("conversationHistory", {}) if isinstance(self.config.get("llm", {}).get("conversationHistory"), dict) else {}
+        self._llm_history_enabled = bool(history_cfg.get("enabled", True))
+        self._llm_history = ConversationHistory(max_turns=int(history_cfg.get("maxTurns", 12)))
+        self._llm_routing_metrics: Dict[str, Any] = {"fallbacks": 0, "probes": 0, "byTier": {}}
         
         # Setup event handlers
         self._setup_handlers()
@@ -104,6 +218,37 @@ class MOLTVILLESkill:
             return 'https://' + server_url[len('wss://'):]
         return server_url
 
+    def _init_llm_scheduler(self) -> LLMScheduler:
+        llm_cfg = self.config.get("llm", {}) if isinstance(self.config.get("llm"), dict) else {}
+        sched_cfg = llm_cfg.get("scheduler", {}) if isinstance(llm_cfg.get("scheduler"), dict) else {}
+        deadlines = sched_cfg.get("deadlineSec") if isinstance(sched_cfg.get("deadlineSec"), dict) else {}
+        priorities = sched_cfg.get("priorities") if isinstance(sched_cfg.get("priorities"), dict) else None
+        return LLMScheduler(
+            max_concurrent=int(sched_cfg.get("maxConcurrent", 1)),
+            max_background_waiting=int(sched_cfg.get("maxBackgroundWaiting", 2)),
+            priorities=priorities,
+            deadlines_sec={
+                "conversation": 30,
+                "decision": 20,
+                "social": 15,
+                "profile": 30,
+                "relationship": 6,
+                **deadlines
+            }
+        )
+
+    def _init_llm_telemetry(self) -> LLMTelemetry:
+        llm_cfg = self.config.get("llm", {}) if isinstance(self.config.get("llm"), dict) else {}
+        trace_cfg = llm_cfg.get("trace", {}) if isinstance(llm_cfg.get("trace"), dict) else {}
+        trace_path = None
+        if trace_cfg.get("enabled", True):
+            trace_path = Path(__file__).parent / str(trace_cfg.get("path", "llm_trace.jsonl"))
+        return LLMTelemetry(
+            trace_path=trace_path,
+            trace_max_bytes=int(trace_cfg.get("maxBytes", 5 * 1024 * 1024)),
+            window=int(trace_cfg.get("window", 200))
+        )
+
     def _update_health_metric(self, key: str, ok: bool = True) -> None:
         metrics = self._health_metrics if isinstance(self._health_metrics, dict) else {}
         entry = metrics.get(key, {}) if isinstance(metrics.get(key), dict) else {}
@@ -118,25 +263,32 @@ class MOLTVILLESkill:
             self.long_memory["healthMetrics"] = metrics
 
     def _save_action_queue(self) -> None:
-        if isinstance(self.long_memory, dict):
-            self.long_memory["pendingActions"] = self._action_queue[-40:]
+        # pendingActions holds the queue itself and is serialized when memory is written,
+        # so saving only has to mark memory dirty, and not more often than the interval.
+        if self._queue_persist_handle is not None:
+            return
+        now = asyncio.get_event_loop().time()
+        wait = self._queue_persisted_at + self._queue_persist_sec - now
+        if wait <= 0:
+            self._queue_persisted_at = now
             self._save_long_memory()
+            return
+        self._queue_persist_handle = asyncio.get_event_loop().call_later(wait, self._persist_action_queue_later)
+
+    def _persist_action_queue_later(self) -> None:
+        self._queue_persist_handle = None
+        self._queue_persisted_at = asyncio.get_event_loop().time()
+        self._save_long_memory()
 
     def _enqueue_action(self, action: Dict[str, Any], source: str = "plan", priority: float = 1.0) -> None:
         if not isinstance(action, dict):
             return
-        item = {
-            "action": action,
-            "priority": float(priority),
-            "source": source,
-            "attempts": 0,
-            "createdAt": int(asyncio.get_event_loop().time() * 1000)
-        }
-        self._action_queue.append(item)
-        self._action_queue.sort(key=lambda it: float(it.get("priority", 0.0)), reverse=True)
-        self._action_queue = self._action_queue[:40]
+        self._action_queue.enqueue(action, source=source, priority=priority)
         self._save_action_queue()
-        self._log_cycle("action_enqueued", source=source, action=action.get("type"), priority=round(float(priority), 3), queueDepth=len(self._action_queue))
+        # Work queued by the running cycle itself (runners-up, retries, recovery) waits for the regular
+        # cadence instead of waking the loop; only work arriving between cycles is picked up right away.
+        self._decision_scheduler.notify("queue", wake=not self._decision_scheduler.in_cycle)
+        self._log_cycle("action_enqueued", source=source, action=action.get("type"), priority=round(float(priority), 3), queueDepth=self._action_queue.depth())
 
     def _save_job_strategy(self) -> None:
         if isinstance(self.long_memory, dict):
@@ -238,12 +390,18 @@ class MOLTVILLESkill:
         self._set_job_block(code, error_msg or "job progression blocked", retry_after_ms=retry_ms, target_job_id=target_job_id)
         self._log_cycle("job_blocked", code=code, status=status or 0, message=error_msg, retryAfterMs=retry_ms)
     def _dequeue_action(self) -> Optional[Dict[str, Any]]:
-        if not self._action_queue:
+        item = self._action_queue.dequeue()
+        if item is None:
             return None
-        item = self._action_queue.pop(0)
         self._save_action_queue()
-        action = item.get("action") if isinstance(item, dict) else None
-        self._log_cycle("action_dequeued", source=item.get("source") if isinstance(item, dict) else None, action=(action.get("type") if isinstance(action, dict) else None), queueDepth=len(self._action_queue))
+        action = item.get("action")
+        self._log_cycle(
+            "action_dequeued",
+            source=item.get("source"),
+            action=(action.get("type") if isinstance(action, dict) else None),
+            queueDepth=self._action_queue.depth(),
+            ageMs=int(time.time() * 1000) - int(item.get("createdAt", 0))
+        )
         return item
 
     async def _http_request(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
@@ -258,8 +416,10 @@ class MOLTVILLESkill:
         backoff = float(self._http_cfg.get("backoffSec", 0.4))
 
         for attempt in range(retries + 1):
+            if expired(0.05):
+                return {"error": "decision cycle deadline exceeded", "status": 0}
             try:
-                timeout = aiohttp.ClientTimeout(total=timeout_s)
+                timeout = aiohttp.ClientTimeout(total=bounded(timeout_s))
                 async with aiohttp.ClientSession(timeout=timeout) as session:
                     async with session.request(method, url, json=payload, headers=headers) as response:
                         text = await response.text()
@@ -267,7 +427,7 @@ class MOLTVILLESkill:
                             data = json.loads(text) if text else {}
                         except json.JSONDecodeError:
                             data = {"raw": text}
-                        if response.status >= 500 and attempt < retries:
+                        if response.status >= 500 and attempt < retries and not expired(backoff * (attempt + 1)):
                             await asyncio.sleep(backoff * (attempt + 1))
                             continue
                         if response.status >= 400:
@@ -284,7 +444,7 @@ class MOLTVILLESkill:
                         self._update_health_metric("http", ok=True)
                         return data if isinstance(data, dict) else {"data": data}
             except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as error:
-                if attempt < retries:
+                if attempt < retries and not expired(backoff * (attempt + 1)):
                     await asyncio.sleep(backoff * (attempt + 1))
                     continue
                 logger.error(f"HTTP request failed: method={method} path={path} error={error}")
@@ -339,20 +499,117 @@ class MOLTVILLESkill:
         except OSError as error:
             logger.warning(f"Failed to save config: {error}")
 
-    def _load_long_memory(self) -> Dict[str, Any]:
-        if not self.long_memory_path.exists():
-            return {"episodes": [], "notes": [], "relationships": {}}
+    def _init_memory_store(self, memory_cfg: Dict[str, Any]) -> Optional[MemoryStore]:
+        if memory_cfg.get("store") != "sqlite":
+            return None
+        path = Path(memory_cfg.get("sqlitePath") or self.long_memory_path.with_name("memory.sqlite3"))
+        if not path.is_absolute():
+            path = Path(__file__).parent / path
         try:
-            return json.loads(self.long_memory_path.read_text())
-        except OSError as error:
-            logger.warning(f"Failed to load long memory: {error}")
+            return MemoryStore(path, max_episodes=int(memory_cfg.get("maxEpisodes", 50000)))
+        except sqlite3.Error as error:
+            logger.warning(f"Failed to open memory store, using memory.json: {error}")
+            return None
+
+    def _load_long_memory(self) -> Dict[str, Any]:
+        data = b""
+        if self.long_memory_path.exists():
+            try:
+                data = self.long_memory_path.read_bytes()
+            except OSError as error:
+                logger.warning(f"Failed to load long memory: {error}")
+        if self._memory_store is not None:
+            try:
+                if self._memory_store.is_empty():
+                    # First run on the SQLite store: import the existing memory.json (+ journal).
+                    memory = self._parse_long_memory(data)
+                    self._journal.replay(memory)
+                    self._memory_store.migrate(memory)
+                    logger.info("Migrated %s episodes into the memory store", len(memory.get("episodes", []) or []))
+                return self._hydrate_memory(self._memory_store.load(episode_limit=80))
+            except (sqlite3.Error, ValueError) as error:
+                logger.warning(f"Failed to load memory store, using memory.json: {error}")
+                self._memory_store = None
+        sectioned = decode_sections(data, self._hydrate_section, HYDRATED_SECTIONS)
+        # Plain JSON written by older versions is parsed and hydrated in full.
+        memory = sectioned if sectioned is not None else self._hydrate_memory(self._parse_long_memory(data))
+        # Replay into a side dict so cold sections are only loaded if the journal touches them.
+        delta: Dict[str, Any] = {"journalSeq": memory.get("journalSeq", 0)}
+        replayed = self._journal.replay(delta, bounded=False)
+        if replayed:
+            logger.info("Replayed %s journaled memory updates", replayed)
+        memory["journalSeq"] = delta["journalSeq"]
+        self._merge_journal_delta(memory, delta)
+        return memory
+
+    def _merge_journal_delta(self, memory: Dict[str, Any], delta: Dict[str, Any]) -> None:
+        """Apply replayed journal entries; episodes they push out of the buffer are folded as in ``_record_episode``."""
+        episodes = memory["episodes"]
+        for entry in delta.get("episodes", []):
+            evicted = episodes.append(Episode.from_json(entry))
+            if evicted is not None:
+                memory["aggregates"].fold(evicted, self.agent_id, self._lexicon.score)
+        for other_id, record in delta.get("relationships", {}).items():
+            memory["relationships"][sys.intern(other_id)] = Relationship.from_json(record)
+
+    @staticmethod
+    def _parse_long_memory(data: bytes) -> Dict[str, Any]:
+        if not data:
             return {"episodes": [], "notes": [], "relationships": {}}
+        memory = json.loads(data)
+        memory.pop(HEADER_KEY, None)
+        return memory
+
+    @staticmethod
+    def _hydrate_section(key: str, value: Any) -> Any:
+        """Turn a persisted section into its in-memory records (back via ``memory_records.to_json``)."""
+        if key == "episodes":
+            episodes = value if isinstance(value, list) else []
+            return RingBuffer(80, (Episode.from_json(e) for e in episodes if isinstance(e, dict)))
+        if key == "relationships":
+            rels = value if isinstance(value, dict) else {}
+            return {sys.intern(str(k)): Relationship.from_json(v) for k, v in rels.items()}
+        if key == "aggregates":
+            return EpisodeAggregator.from_json(value)
+        return value
+
+    @classmethod
+    def _hydrate_memory(cls, memory: Dict[str, Any]) -> Dict[str, Any]:
+        for key in HYDRATED_SECTIONS:
+            memory[key] = cls._hydrate_section(key, memory.get(key))
+        return memory
 
     def _save_long_memory(self) -> None:
-        try:
-            self.long_memory_path.write_text(json.dumps(self.long_memory, indent=2))
-        except OSError as error:
-            logger.warning(f"Failed to save long memory: {error}")
+        """Mark memory dirty; the writer coalesces saves and compacts the journal into the snapshot."""
+        self._memory_writer.mark_dirty()
+
+    def _memory_snapshot(self) -> Dict[str, Any]:
+        # Deep-copy on the loop so the worker thread serializes a stable view and
+        # the snapshot's journalSeq matches exactly the entries it contains.
+        memory = self.long_memory if isinstance(getattr(self, "long_memory", None), dict) else {}
+        skip = TABLE_KEYS if self._memory_store else ()
+        # Sections never loaded since startup are written back as their original text.
+        items = memory.raw_items() if isinstance(memory, SectionedMemory) else memory.items()
+        snapshot = {key: value if isinstance(value, RawSection) else detach(value) for key, value in items if key not in skip}
+        snapshot["journalSeq"] = self._journal.seq
+        return snapshot
+
+    def _journal_memory_update(self, op: str, data: Dict[str, Any]) -> None:
+        """Persist one episode/relationship change as a journal line; compact once the journal grows."""
+        if self._memory_store is not None:
+            try:
+                if op == "episode":
+                    self._memory_store.add_episode(data)
+                else:
+                    self._memory_store.put_relationship(data["id"], data["record"])
+            except sqlite3.Error as error:
+                logger.warning(f"Failed to write memory store: {error}")
+            return
+        if self._journal.append(op, data) is None:
+            self._save_long_memory()
+            return
+        if self._journal.pending >= self._journal_compact_entries or self._journal.bytes >= self._journal_compact_bytes:
+            self._save_long_memory()
 
     def _apply_profile_traits(self, profile: Dict[str, Any]) -> None:
         if not isinstance(profile, dict):
@@ -477,11 +734,7 @@ class MOLTVILLESkill:
                 step["status"] = "done"
 
         # Social progress from relationships (memory + live context)
-        rel_notes = self.long_memory.get("relationships", {}) if isinstance(self.long_memory, dict) else {}
-        best_rel = max([
-            (r.get("affinity", 0) + r.get("trust", 0) + r.get("respect", 0))
-            for r in (rel_notes.values() if isinstance(rel_notes, dict) else [])
-        ] + [0])
+        best_rel = max(self._relationship_matrix.max_score(), 0)
         if best_rel >= 4:
             for step_id in ("build_support", "help_citizens", "build_relationship"):
                 step = next((s for s in chain if s.get("id") == step_id), None)
@@ -595,7 +848,7 @@ class MOLTVILLESkill:
             "name": self.config.get("agent", {}).get("name"),
             "personality_hint": self.config.get("agent", {}).get("personality")
         }
-        profile = await self._call_llm_json(prompt, payload)
+        profile = await self._call_llm_json(prompt, payload, kind="profile", schema="profile")
         if isinstance(profile, dict):
             self.long_memory["profile"] = profile
             self._save_long_memory()
@@ -745,15 +998,10 @@ class MOLTVILLESkill:
     def _approval_ratio(self, relationships: Dict[str, Any]) -> float:
         if not relationships:
             return 0.0
-        approvals = 0
-        total = 0
-        for _, rel in relationships.items():
-            if not isinstance(rel, dict):
-                continue
-            total += 1
-            if rel.get("affinity", 0) >= 2 or rel.get("trust", 0) >= 2:
-                approvals += 1
-        return approvals / max(total, 1)
+        if relationships is not self._live_relationships_source:
+            self._live_relationships.load(relationships)
+            self._live_relationships_source = relationships
+        return self._live_relationships.approval_share(2)
 
     def _pick_hotspot(self, intent: str) -> Dict[str, int]:
         hotspots = {
@@ -806,75 +1054,173 @@ class MOLTVILLESkill:
             return
         if self._is_meta_message(message):
             return
-        entry = {
-            "speakerId": speaker_id,
-            "message": message.strip()[:280],
-            "timestamp": int(asyncio.get_event_loop().time() * 1000)
-        }
-        self._recent_utterances.append(entry)
-        self._recent_utterances = self._recent_utterances[-12:]
+        self._recent_utterances.append(Utterance(
+            speaker_id,
+            message.strip()[:280],
+            int(asyncio.get_event_loop().time() * 1000)
+        ))
+
+    def _episode_index(self) -> Optional[EpisodeIndex]:
+        if self._memory_index is not None and not self._memory_index_primed:
+            self._memory_index_primed = True
+            for episode in self.long_memory["episodes"]:
+                self._memory_index.add(episode, EpisodeIndex.episode_text(episode.type, episode.data))
+        return self._memory_index
 
     def _record_episode(self, kind: str, data: Dict[str, Any]) -> None:
-        entry = {
-            "type": kind,
-            "data": data,
-            "timestamp": int(asyncio.get_event_loop().time() * 1000)
-        }
-        self.long_memory.setdefault("episodes", []).append(entry)
-        self.long_memory["episodes"] = self.long_memory["episodes"][-80:]
-        self._save_long_memory()
+        index = self._episode_index()
+        entry = Episode(kind, data, int(asyncio.get_event_loop().time() * 1000))
+        evicted = self.long_memory["episodes"].append(entry)
+        self._journal_memory_update("episode", entry.to_json())
+        if index is not None:
+            index.add(entry, EpisodeIndex.episode_text(kind, data))
+        if evicted is not None:
+            # Keep what the buffer forgets as running per-partner/per-conversation totals. The journal
+            # line above already implies this fold (replay redoes it), so the next snapshot persists it;
+            # only the SQLite store, which has no replay, needs its state saved now.
+            self.long_memory["aggregates"].fold(evicted, self.agent_id, self._lexicon.score)
+            if self._memory_store is not None:
+                self._save_long_memory()
+
+    def _lexicon_relationship_scores(self, messages_by_speaker: Dict[str, List[str]]) -> Dict[str, Tuple[Dict[str, Any], float]]:
+        """Local lexicon scoring per speaker: (analysis, confidence of the least certain message)."""
+        flat = [(speaker_id, message) for speaker_id, messages in messages_by_speaker.items() for message in messages]
+        scores = self._lexicon.score_batch([message for _, message in flat])
+        per_speaker: Dict[str, List[Tuple[float, float]]] = {}
+        for (speaker_id, _), score in zip(flat, scores):
+            per_speaker.setdefault(speaker_id, []).append(score)
+        results: Dict[str, Tuple[Dict[str, Any], float]] = {}
+        for speaker_id, items in per_speaker.items():
+            weight = sum(conf for _, conf in items)
+            polarity = sum(pol * conf for pol, conf in items) / weight if weight else 0.0
+            deltas = LexiconScorer.to_deltas(polarity)
+            note = "buena impresión" if deltas["affinityDelta"] > 0 else ("tenso" if deltas["affinityDelta"] < 0 else "neutral")
+            results[speaker_id] = ({**deltas, "note": note}, min(conf for _, conf in items))
+        return results
 
     async def _analyze_relationship(self, speaker_id: str, message: str) -> Dict[str, Any]:
+        results = await self._analyze_relationship_batch({speaker_id: [message]})
+        return results.get(speaker_id, {})
+
+    async def _analyze_relationship_batch(self, messages_by_speaker: Dict[str, List[str]]) -> Dict[str, Dict[str, Any]]:
+        """Score a window locally; only low-confidence speakers are escalated to one LLM call."""
+        if not messages_by_speaker:
+            return {}
+        lexicon = self._lexicon_relationship_scores(messages_by_speaker)
+        scored: Dict[str, Dict[str, Any]] = {
+            speaker_id: analysis for speaker_id, (analysis, confidence) in lexicon.items()
+            if confidence >= self._relation_min_confidence
+        }
+        escalate = {speaker_id: messages for speaker_id, messages in messages_by_speaker.items() if speaker_id not in scored}
+        self._relation_metrics["lexicon"] += len(scored)
+        self._relation_metrics["escalated"] += len(escalate)
+        if not escalate:
+            return scored
         prompt = (
-            "Eres un ciudadano de MOLTVILLE evaluando una interacciÃ³n social. "
-            "Devuelve SOLO JSON con campos: affinityDelta, trustDelta, respectDelta (-2 a 2), "
-            "y note (mÃ¡x 8 palabras) en tono in-world."
+            "Eres un ciudadano de MOLTVILLE evaluando interacciones sociales recientes. "
+            "Para CADA otherId de speakers evalúa sus mensajes hacia ti. "
+            "Devuelve SOLO JSON con {\"results\": [{\"otherId\": \"...\", \"affinityDelta\": 0, \"trustDelta\": 0, \"respectDelta\": 0, \"note\": \"...\"}]}. "
+            "Los deltas van de -2 a 2 y note tiene máx 8 palabras en tono in-world."
         )
         payload = {
             "self": self.config.get("agent", {}).get("name"),
-            "otherId": speaker_id,
-            "message": message
-        }
-        result = await self._call_llm_json(prompt, payload)
-        if isinstance(result, dict):
-            return result
-        lowered = message.lower()
-        pos = ["gracias", "genial", "perfecto", "me encanta", "bien", "claro"]
-        neg = ["no", "mal", "nunca", "molesta", "odio", "mentira"]
-        score = 1 if any(p in lowered for p in pos) else (-1 if any(n in lowered for n in neg) else 0)
-        return {
-            "affinityDelta": score,
-            "trustDelta": score,
-            "respectDelta": 0,
-            "note": "buena impresiÃ³n" if score > 0 else ("tenso" if score < 0 else "neutral")
+            "speakers": [
+                {"otherId": speaker_id, "messages": [m[:160] for m in messages[-4:]]}
+                for speaker_id, messages in escalate.items()
+            ]
         }
+        result = await self._call_llm_json(prompt, payload, kind="relationship", schema="relationship")
+        rows = result.get("results") if isinstance(result, dict) else None
+        for row in rows if isinstance(rows, list) else []:
+            if not isinstance(row, dict) or row.get("otherId") not in escalate:
+                continue
+            deltas = {}
+            try:
+                for key in ("affinityDelta", "trustDelta", "respectDelta"):
+                    deltas[key] = max(-2, min(2, int(round(float(row.get(key, 0) or 0)))))
+            except (TypeError, ValueError):
+                continue
+            scored[row["otherId"]] = {**deltas, "note": str(row.get("note", ""))[:80]}
+        for speaker_id in escalate:
+            if speaker_id not in scored:
+                scored[speaker_id] = lexicon[speaker_id][0]
+        return scored
+
+    def _queue_relationship_analysis(self, speaker_id: str, message: str) -> None:
+        self._relation_batch.append({"speakerId": speaker_id, "message": message})
+        if len(self._relation_batch) >= self._relation_batch_max:
+            # Flush now; the window timer would otherwise flush a second time.
+            if self._relation_batch_task and not self._relation_batch_task.done():
+                self._relation_batch_task.cancel()
+            self._relation_batch_task = None
+            self._start_relationship_flush()
+            return
+        if not self._relation_batch_task or self._relation_batch_task.done():
+            self._relation_batch_task = asyncio.create_task(self._relationship_batch_after_window())
+
+    async def _relationship_batch_after_window(self) -> None:
+        await asyncio.sleep(self._relation_batch_window)
+        self._relation_batch_task = None
+        self._start_relationship_flush()
+
+    def _start_relationship_flush(self) -> None:
+        # One flush at a time; messages queued meanwhile are picked up when it finishes.
+        if self._relation_flush_task and not self._relation_flush_task.done():
+            return
+        self._relation_flush_task = asyncio.create_task(self._flush_relationship_batch())
+
+    async def _flush_relationship_batch(self) -> None:
+        batch, self._relation_batch = self._relation_batch, []
+        if not batch:
+            return
+        grouped: Dict[str, List[str]] = {}
+        for item in batch:
+            grouped.setdefault(item["speakerId"], []).append(item["message"])
+        try:
+            results = await self._analyze_relationship_batch(grouped)
+        except Exception as error:
+            self._log_cycle("relationship_batch_error", speakers=len(grouped), error=str(error))
+            return
+        finally:
+            if self.connected and self._relation_batch and (not self._relation_batch_task or self._relation_batch_task.done()):
+                self._relation_batch_task = asyncio.create_task(self._relationship_batch_after_window())
+        now = asyncio.get_event_loop().time()
+        for speaker_id, analysis in results.items():
+            self._update_relationship_memory(speaker_id, grouped[speaker_id][-1], analysis)
+            self._last_relation_update[speaker_id] = now
+        self._log_cycle("relationship_batch", speakers=len(grouped), messages=len(batch))
 
     def _update_relationship_memory(self, speaker_id: str, message: str, analysis: Dict[str, Any]) -> None:
         if not speaker_id:
             return
-        rels = self.long_memory.setdefault("relationships", {})
-        current = rels.get(speaker_id, {}) if isinstance(rels.get(speaker_id), dict) else {}
+        rels = self.long_memory["relationships"]
+        current = rels.get(speaker_id) or Relationship()
         def clamp(val, lo=-10, hi=10):
             return max(lo, min(hi, val))
-        affinity = clamp(int(current.get("affinity", 0)) + int(analysis.get("affinityDelta", 0)))
-        trust = clamp(int(current.get("trust", 0)) + int(analysis.get("trustDelta", 0)))
-        respect = clamp(int(current.get("respect", 0)) + int(analysis.get("respectDelta", 0)))
-        rels[speaker_id] = {
-            **current,
-            "affinity": affinity,
-            "trust": trust,
-            "respect": respect,
-            "lastNote": str(analysis.get("note", ""))[:80],
-            "lastMessage": message[:160]
-        }
-        self._save_long_memory()
+        record = Relationship(
+            clamp(current.affinity + int(analysis.get("affinityDelta", 0))),
+            clamp(current.trust + int(analysis.get("trustDelta", 0))),
+            clamp(current.respect + int(analysis.get("respectDelta", 0))),
+            str(analysis.get("note", ""))[:80],
+            message[:160],
+            current.extra
+        )
+        speaker_id = sys.intern(speaker_id)
+        rels[speaker_id] = record
+        self._relationship_matrix.set(speaker_id, record.affinity, record.trust, record.respect)
+        self._journal_memory_update("relationship", {"id": speaker_id, "record": record.to_json()})
 
     def _get_recent_context(self) -> Dict[str, Any]:
-        cleaned = [u for u in self._recent_utterances if not self._is_meta_message(u.get("message", ""))]
+        cleaned = [u.to_json() for u in self._recent_utterances if not self._is_meta_message(u.message)]
+        rels = self.long_memory["relationships"]
         return {
-            "recentUtterances": list(cleaned),
-            "episodes": self.long_memory.get("episodes", [])[-10:],
-            "relationshipNotes": self.long_memory.get("relationships", {}),
+            "recentUtterances": cleaned,
+            "episodes": [entry.to_json() for entry in self.long_memory["episodes"].tail(6)],
+            "partners": self.long_memory["aggregates"].summaries(5),
+            "relationshipNotes": {
+                other_id: rels[other_id].to_json()
+                for other_id, _ in self._relationship_matrix.top_k(12, absolute=True)
+            },
             "planState": self.long_memory.get("planState", {}),
             "goalState": self.long_memory.get("goalState", {})
         }
@@ -909,12 +1255,23 @@ class MOLTVILLESkill:
         async def disconnect():
             logger.info("Disconnected from MOLTVILLE server")
             self.connected = False
+            if self._journal.pending:
+                self._save_long_memory()
+            await self._memory_writer.flush()
             if self._auto_task:
                 self._auto_task.cancel()
                 self._auto_task = None
             if self._decision_task:
                 self._decision_task.cancel()
                 self._decision_task = None
+            if self._relation_batch_task:
+                self._relation_batch_task.cancel()
+                self._relation_batch_task = None
+            if self._relation_flush_task:
+                self._relation_flush_task.cancel()
+                self._relation_flush_task = None
+            for conv_id in list(self._reply_jobs.keys()):
+                self._cancel_conversation_reply(conv_id)
         
         @self.sio.on('agent:registered')
         async def agent_registered(data):
@@ -938,6 +1295,13 @@ class MOLTVILLESkill:
         async def perception_update(data):
             logger.debug(f"Perception update: {data}")
             self.current_state['perception'] = data
+            self._action_tracker.observe(data)
+            self._decision_scheduler.observe(self._perception_key(data))
+
+        @self.sio.on('agent:spoke')
+        async def agent_spoke(data):
+            if isinstance(data, dict) and self.agent_id and data.get('agentId') == self.agent_id:
+                self._action_tracker.confirm_echo("speak")
         
         @self.sio.on('perception:speech')
         async def perception_speech(data):
@@ -965,6 +1329,10 @@ class MOLTVILLESkill:
                     "conversationId": conv_id,
                     "with": other_id
                 })
+                messages = data.get('messages') if isinstance(data.get('messages'), list) else []
+                initiator = messages[0].get('from') if messages and isinstance(messages[0], dict) else None
+                if initiator and initiator != self.agent_id:
+                    self._preempt_decision("conversation_started")
 
         @self.sio.on('conversation:message')
         async def conversation_message(data):
@@ -982,17 +1350,11 @@ class MOLTVILLESkill:
                     "message": text
                 })
                 if from_id != self.agent_id:
-                    now = asyncio.get_event_loop().time()
-                    last_rel = self._last_relation_update.get(from_id, 0)
-                    if now - last_rel >= self._relation_update_cooldown:
-                        async def rel_task():
-                            analysis = await self._analyze_relationship(from_id, text)
-                            if isinstance(analysis, dict):
-                                self._update_relationship_memory(from_id, text, analysis)
-                            self._last_relation_update[from_id] = asyncio.get_event_loop().time()
-                        asyncio.create_task(rel_task())
+                    self._queue_relationship_analysis(from_id, text)
             if conv_id and from_id and from_id != self.agent_id:
-                asyncio.create_task(self._respond_to_conversation(conv_id))
+                # The reply job answers right away; the loop only has to drop what it was deciding.
+                self._preempt_decision("conversation_message", wake=False)
+                self._schedule_conversation_reply(conv_id)
 
         @self.sio.on('conversation:ended')
         async def conversation_ended(data):
@@ -1003,6 +1365,8 @@ class MOLTVILLESkill:
             for key in to_remove:
                 self._conversation_state.pop(key, None)
             if conv_id:
+                self._cancel_conversation_reply(conv_id)
+                self._llm_history.reset(conv_id)
                 self._record_episode('conversation_ended', {"conversationId": conv_id})
 
         @self.sio.on('agent:goal')
@@ -1012,10 +1376,12 @@ class MOLTVILLESkill:
                     **data,
                     "receivedAt": int(asyncio.get_event_loop().time() * 1000)
                 })
+                self._preempt_decision("agent_goal")
         
         @self.sio.event
         async def error(data):
             logger.error(f"Server error: {data}")
+            self._action_tracker.reject(data.get('message') if isinstance(data, dict) else str(data))
             if isinstance(data, dict) and data.get('message') == 'API key revoked':
                 logger.error("API key revoked; disconnecting.")
                 await self.disconnect()
@@ -1089,12 +1455,12 @@ class MOLTVILLESkill:
             logger.debug(f"Failed to send profile update: {error}")
 
     async def _run_auto_explore(self) -> None:
-        interval_ms = self.config.get("behavior", {}).get("decisionInterval", 30000)
-        interval_sec = max(interval_ms / 1000, 1)
+        scheduler = self._decision_scheduler
         while True:
             if not self.connected:
                 await asyncio.sleep(1)
                 continue
+            scheduler.begin()
             perception = await self.perceive()
             position = perception.get("position") or {}
             current_x = position.get("x")
@@ -1105,46 +1471,133 @@ class MOLTVILLESkill:
                 if dx == 0 and dy == 0:
                     dx = 1
                 await self.move(current_x + dx, current_y + dy)
-            await asyncio.sleep(interval_sec)
+            scheduler.end()
+            await scheduler.wait()
 
     async def _run_decision_loop(self) -> None:
         decision_config = self.config.get("behavior", {}).get("decisionLoop", {})
-        interval_ms = decision_config.get("intervalMs", 20000)
-        interval_sec = max(interval_ms / 1000, 2)
+        cycle_budget = float(decision_config.get("cycleBudgetSec", 30))
+        scheduler = self._decision_scheduler
         while True:
             if not self.connected:
                 await asyncio.sleep(1)
                 continue
             try:
-                perception = await self.perceive()
-                if not perception or isinstance(perception, dict) and perception.get("error"):
-                    self._update_health_metric("perceive", ok=False)
-                    await asyncio.sleep(interval_sec)
-                    continue
-                self._update_health_metric("perceive", ok=True)
-                await self._purge_stale_conversations(perception)
-                await self._ensure_plan(perception)
-                await self._send_profile_update()
+                cycle_started = asyncio.get_event_loop().time()
+                scheduler.begin()
+                with cycle_deadline(cycle_budget):
+                    perception = await self.perceive()
+                    if not perception or isinstance(perception, dict) and perception.get("error"):
+                        self._update_health_metric("perceive", ok=False)
+                        scheduler.end()
+                        await scheduler.wait()
+                        continue
+                    self._update_health_metric("perceive", ok=True)
+                    await self._purge_stale_conversations(perception)
+                    await self._ensure_plan(perception)
+                    await self._send_profile_update()
                 try:
                     await asyncio.wait_for(self._decision_lock.acquire(), timeout=self._decision_lock_timeout)
                 except asyncio.TimeoutError:
                     self._log_cycle("decision_skip", reason="decision_lock_timeout")
-                    await asyncio.sleep(interval_sec)
+                    scheduler.end()
+                    await scheduler.wait()
                     continue
                 try:
-                    action = await self._decide_action(perception)
-                    if action:
-                        self._log_cycle("decision", intent=self._current_intent, action=action.get("type"), queueDepth=len(self._action_queue))
-                        await self._execute_action(action)
+                    budget_left = cycle_budget - (asyncio.get_event_loop().time() - cycle_started)
+                    generation = self._decision_generation
+                    self._decision_preempted = False
+                    self._decision_inflight_since = asyncio.get_event_loop().time()
+                    self._decision_inflight = asyncio.create_task(self._decide_within_budget(perception, budget_left))
+                    try:
+                        action = await self._decision_inflight
+                    except asyncio.CancelledError:
+                        if not self._decision_preempted:
+                            raise
+                        action = None
+                    finally:
+                        self._decision_inflight = None
+                    if self._decision_preempted:
+                        # Fall through to the scheduler: only events notified with wake=True restart early.
+                        pass
+                    elif action and self._decision_generation != generation:
+                        # Something more important happened while deciding; decide again on fresh state.
+                        self._preempt_metrics["stale"] += 1
+                        self._log_cycle("decision_stale", action=action.get("type"))
+                    elif action:
+                        self._log_cycle("decision", intent=self._current_intent, action=action.get("type"), queueDepth=self._action_queue.depth())
+                        await self._execute_action(action, decided_at=cycle_started)
                     else:
-                        self._log_cycle("decision_none", intent=self._current_intent, queueDepth=len(self._action_queue), hasConversationState=bool(self._conversation_state))
+                        self._log_cycle("decision_none", intent=self._current_intent, queueDepth=self._action_queue.depth(), hasConversationState=bool(self._conversation_state))
                 finally:
                     if self._decision_lock.locked():
                         self._decision_lock.release()
             except Exception as error:
                 self._update_health_metric("decision_loop", ok=False)
                 self._log_cycle("decision_error", error=str(error))
-            await asyncio.sleep(interval_sec)
+            scheduler.end()
+            reason = await scheduler.wait()
+            if reason != "timer":
+                self._log_cycle("decision_wakeup", reason=reason, idleIntervalSec=round(scheduler.interval_sec, 3))
+
+    @staticmethod
+    def _perception_key(perception: Any) -> Optional[Tuple[Any, ...]]:
+        """What the decision loop reacts to: nearby agents, needs (in steps of 10), building, conversations."""
+        if not isinstance(perception, dict):
+            return None
+        nearby = tuple(sorted(str(agent.get("id")) for agent in (perception.get("nearbyAgents") or []) if isinstance(agent, dict)))
+        needs = perception.get("needs") if isinstance(perception.get("needs"), dict) else {}
+        need_levels = tuple(sorted(
+            (str(name), int(value) // 10) for name, value in needs.items() if isinstance(value, (int, float))
+        ))
+        building = (perception.get("currentBuilding") or {}).get("id") if isinstance(perception.get("currentBuilding"), dict) else None
+        conversations = tuple(sorted(
+            str(conv.get("id")) for conv in (perception.get("conversations") or []) if isinstance(conv, dict)
+        ))
+        return (nearby, need_levels, building, conversations)
+
+    def _on_action_outcome(self, record: Dict[str, Any]) -> None:
+        self._log_cycle("action_outcome", **record)
+        if record.get("ok") and record.get("type") in ("move_to", "enter_building"):
+            self._decision_scheduler.notify("arrival")
+
+    def _preempt_decision(self, reason: str, wake: bool = True) -> None:
+        """Cancel an in-flight decision (and its LLM call) for a higher-priority event; optionally re-decide now."""
+        self._decision_generation += 1
+        inflight = self._decision_inflight
+        if inflight and not inflight.done():
+            elapsed_ms = (asyncio.get_event_loop().time() - self._decision_inflight_since) * 1000
+            self._decision_preempted = True
+            inflight.cancel()
+            self._preempt_metrics["preempted"] += 1
+            self._preempt_metrics["preemptedMs"] = round(self._preempt_metrics["preemptedMs"] + elapsed_ms, 1)
+            by_reason = self._preempt_metrics["byReason"]
+            by_reason[reason] = by_reason.get(reason, 0) + 1
+            self._log_cycle("decision_preempted", reason=reason, elapsedMs=round(elapsed_ms, 1))
+        if wake:
+            self._preempt_metrics["wakeups"] += 1
+        self._decision_scheduler.notify(reason, wake=wake)
+
+    async def _decide_within_budget(self, perception: Dict[str, Any], budget_sec: float) -> Optional[Dict[str, Any]]:
+        """Run `_decide_action` under the cycle deadline; fall back to the heuristic once it is spent."""
+        started = asyncio.get_event_loop().time()
+        timed_out = False
+        with cycle_deadline(budget_sec):
+            try:
+                action = await asyncio.wait_for(self._decide_action(perception), timeout=remaining())
+            except asyncio.TimeoutError:
+                action = None
+                timed_out = True
+            spent = expired()
+        if action is None and spent:
+            self._log_cycle(
+                "decision_deadline",
+                budgetSec=round(budget_sec, 3),
+                elapsedSec=round(asyncio.get_event_loop().time() - started, 3),
+                cancelled=timed_out
+            )
+            action = await self._heuristic_decision(perception)
+        return action
 
     def _prune_goals(self) -> None:
         if not self._active_goals:
@@ -1180,12 +1633,46 @@ class MOLTVILLESkill:
             for key in stale_keys:
                 self._conversation_state.pop(key, None)
 
+    def _schedule_conversation_reply(self, conv_id: str) -> None:
+        """Keep at most one pending reply job per conversation; later messages fold into it."""
+        self._reply_metrics["requested"] += 1
+        job = self._reply_jobs.get(conv_id)
+        if job and not job.done():
+            self._reply_dirty.add(conv_id)
+            self._reply_metrics["coalesced"] += 1
+            return
+        self._reply_jobs[conv_id] = asyncio.create_task(self._run_conversation_reply(conv_id))
+
+    def _cancel_conversation_reply(self, conv_id: str) -> None:
+        job = self._reply_jobs.pop(conv_id, None)
+        self._reply_dirty.discard(conv_id)
+        if job and not job.done():
+            job.cancel()
+            self._reply_metrics["cancelled"] += 1
+
+    async def _run_conversation_reply(self, conv_id: str) -> None:
+        try:
+            while True:
+                # Short debounce so a burst of messages is answered once.
+                await asyncio.sleep(self._reply_debounce)
+                self._reply_dirty.discard(conv_id)
+                self._reply_metrics["runs"] += 1
+                await self._respond_to_conversation(conv_id)
+                if conv_id not in self._reply_dirty:
+                    break
+        finally:
+            if self._reply_jobs.get(conv_id) is asyncio.current_task():
+                self._reply_jobs.pop(conv_id, None)
+                self._reply_dirty.discard(conv_id)
+
     async def _respond_to_conversation(self, conv_id: str) -> None:
         try:
             await asyncio.wait_for(self._conversation_lock.acquire(), timeout=self._conversation_lock_timeout)
         except asyncio.TimeoutError:
             self._log_cycle("conversation_skip", reason="conversation_lock_timeout", conversationId=conv_id)
             return
+        # Messages that arrived while queued are covered by the perception below.
+        self._reply_dirty.discard(conv_id)
         try:
             now = asyncio.get_event_loop().time()
             last = self._last_conversation_ts.get(conv_id, 0)
@@ -1210,6 +1697,7 @@ class MOLTVILLESkill:
                 return
             if last_text == self._last_conversation_msg.get(conv_id):
                 return
+            decided_at = asyncio.get_event_loop().time()
             action = await self._decide_with_llm(perception, force_conversation=True, forced_conversation_id=conv_id)
             if not action:
                 # LLM failed to produce a valid conversation response.
@@ -1226,7 +1714,7 @@ class MOLTVILLESkill:
                     if not params.get("conversation_id"):
                         params["conversation_id"] = conv_id
                         action["params"] = params
-                await self._execute_action(action)
+                await self._execute_action(action, decided_at=decided_at)
                 # Use loop-time seconds (same unit used for cooldown comparisons)
                 self._last_conversation_ts[conv_id] = asyncio.get_event_loop().time()
                 self._last_conversation_msg[conv_id] = last_text
@@ -1654,9 +2142,15 @@ class MOLTVILLESkill:
         balance = float(econ.get("balance", 0) or 0)
         properties = econ.get("properties") if isinstance(econ.get("properties"), list) else []
 
-        # Refresh every cycle so votes see latest job applications.
+        # Refresh every cycle so votes see latest job applications. Both listings are plain reads, so
+        # when the property market will be checked too it is fetched alongside the jobs.
+        wants_properties = has_job and not properties and balance >= 90
+        reads = {"jobs": self.list_jobs()}
+        if wants_properties:
+            reads["properties"] = self.list_properties()
+        fetches, _ = await self._run_candidate_generators(reads, self._generator_timeout())
         jobs = []
-        fetched = await self.list_jobs()
+        fetched = fetches.get("jobs")
         if isinstance(fetched, dict):
             jobs = fetched.get("jobs", []) or []
             self.current_state["jobs"] = jobs
@@ -1686,10 +2180,10 @@ class MOLTVILLESkill:
             if available:
                 return {"type": "apply_job", "params": {"job_id": available[0].get("id")}}
 
-        if has_job and not properties and balance >= 90:
+        if wants_properties:
             # Refresh market each cycle; avoid stale property cache blocking purchases.
             props = []
-            listed = await self.list_properties()
+            listed = fetches.get("properties")
             if isinstance(listed, dict):
                 props = listed.get("properties", []) or []
                 self.current_state["properties"] = props
@@ -1718,14 +2212,71 @@ class MOLTVILLESkill:
             return {"type": "join_event", "params": {"event_id": event_id}}
         return None
 
+    async def _run_candidate_generators(
+        self,
+        generators: Dict[str, Any],
+        timeout_sec: Optional[float]
+    ) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+        """Await candidate coroutines concurrently; ones still running after ``timeout_sec`` are cancelled.
+
+        Returns the candidates that finished and a per-generator timing record.
+        """
+        loop = asyncio.get_event_loop()
+        started = loop.time()
+        finished_at: Dict[str, float] = {}
+
+        async def timed(name: str, coro: Any) -> Any:
+            try:
+                return await coro
+            finally:
+                finished_at[name] = loop.time()
+
+        tasks = {name: asyncio.create_task(timed(name, coro)) for name, coro in generators.items()}
+        try:
+            _, pending = await asyncio.wait(tasks.values(), timeout=timeout_sec)
+        finally:
+            # Also reached when the decision itself is preempted: no generator outlives it.
+            for task in tasks.values():
+                if not task.done():
+                    task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        results: Dict[str, Any] = {}
+        timings: Dict[str, Dict[str, Any]] = {}
+        for name, task in tasks.items():
+            elapsed_ms = round((finished_at.get(name, loop.time()) - started) * 1000, 1)
+            if task in pending:
+                timings[name] = {"ms": elapsed_ms, "status": "timeout"}
+            elif task.exception() is not None:
+                timings[name] = {"ms": elapsed_ms, "status": "error", "error": str(task.exception())[:120]}
+            else:
+                results[name] = task.result()
+                timings[name] = {"ms": elapsed_ms, "status": "ok" if results[name] is not None else "empty"}
+        return results, timings
+
+    def _generator_timeout(self) -> Optional[float]:
+        """Time a candidate generator may take: the remaining cycle budget, capped at ``generatorTimeoutSec``."""
+        decision_config = self.config.get("behavior", {}).get("decisionLoop", {})
+        generator_timeout = decision_config.get("generatorTimeoutSec") if isinstance(decision_config, dict) else None
+        return bounded(float(generator_timeout) if isinstance(generator_timeout, (int, float)) else None)
+
     async def _goal_action(self, perception: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        coordination = await self._coordination_action(perception)
-        motivation = await self._next_motivation_action(perception)
-        economy = await self._economy_action(perception)
+        # Generators do their own REST (and possibly LLM) calls; run them side by side under the
+        # cycle deadline and score whatever came back in time.
+        results, timings = await self._run_candidate_generators(
+            {
+                "coordination": self._coordination_action(perception),
+                "motivation": self._next_motivation_action(perception),
+                "economy": self._economy_action(perception)
+            },
+            self._generator_timeout()
+        )
         event_action = self._event_action(perception)
 
-        candidates = [c for c in (coordination, motivation, economy, event_action) if isinstance(c, dict)]
+        candidates = [results.get(name) for name in ("coordination", "motivation", "economy")] + [event_action]
+        candidates = [c for c in candidates if isinstance(c, dict)]
         if not candidates:
+            self._log_cycle("goal_vector_scores", top=[], generators=timings)
             return None
 
         scored = []
@@ -1744,7 +2295,7 @@ class MOLTVILLESkill:
                 "vector": {k: round(float(v), 4) for k, v in (item[2] or {}).items()}
             }
             for item in scored[:3]
-        ])
+        ], generators=timings)
         if len(scored) > 1:
             for score, candidate, _, _ in scored[1:3]:
                 self._enqueue_action(candidate, source="goal_buffer", priority=max(0.1, score))
@@ -1817,21 +2368,13 @@ class MOLTVILLESkill:
         last_action = self._plan_state.get("lastAction") if isinstance(self._plan_state, dict) else None
         if not isinstance(last_action, dict):
             return True
-        action_type = last_action.get("type")
+        # A confirmed or rejected outcome beats guessing from the current perception.
+        outcome = self._action_tracker.outcome(last_action.get("id"))
+        if outcome is not None:
+            return outcome
         params = last_action.get("params", {}) if isinstance(last_action.get("params"), dict) else {}
-        if action_type == "move_to":
-            pos = perception.get("position", {}) or {}
-            tx, ty = params.get("x"), params.get("y")
-            if isinstance(tx, (int, float)) and isinstance(ty, (int, float)):
-                if isinstance(pos.get("x"), (int, float)) and isinstance(pos.get("y"), (int, float)):
-                    return abs(pos.get("x") - tx) <= 2 and abs(pos.get("y") - ty) <= 2
-        if action_type == "enter_building":
-            current = perception.get("currentBuilding") or {}
-            return current.get("id") == params.get("building_id")
-        if action_type == "start_conversation":
-            convs = perception.get("conversations", []) or []
-            return any(params.get("target_id") in (c.get("participants") or []) for c in convs)
-        return True
+        effect = perceived_effect(str(last_action.get("type") or ""), params, perception)
+        return True if effect is None else effect
 
     def _should_replan(self, perception: Dict[str, Any]) -> bool:
         if not isinstance(self._plan_state, dict):
@@ -2006,15 +2549,21 @@ class MOLTVILLESkill:
         if pre.get("mode") == "act" and isinstance(pre.get("action"), dict):
             return pre.get("action")
 
+        decision_config = self.config.get("behavior", {}).get("decisionLoop", {})
+        mode = decision_config.get("mode", "heuristic")
         # Economy priority only when intent is work; otherwise let vector/planning preserve social dynamism.
+        # The plan path has side effects (negotiation proposals, candidate registration, LLM calls),
+        # so it only runs once the economy check came back empty.
         if self._current_intent == "work":
-            econ_priority = await self._economy_action(perception)
+            results, timings = await self._run_candidate_generators(
+                {"economy": self._economy_action(perception)}, self._generator_timeout()
+            )
+            self._log_cycle("decision_generators", generators=timings)
+            econ_priority = results.get("economy")
             if isinstance(econ_priority, dict) and econ_priority.get("type") in ("vote_job", "apply_job", "buy_property"):
                 self._log_cycle("economy_priority_action", action=econ_priority.get("type"))
                 return econ_priority
 
-        decision_config = self.config.get("behavior", {}).get("decisionLoop", {})
-        mode = decision_config.get("mode", "heuristic")
         if mode == "llm":
             convs = perception.get("conversations", []) or []
             own_live_conversation = any(
@@ -2087,7 +2636,7 @@ class MOLTVILLESkill:
         if not isinstance(action, dict):
             return None
         action_type = action.get("type")
-        if not isinstance(action_type, str):
+        if action_type not in ACTION_TYPES:
             return None
         params = action.get("params", {}) or {}
         if not isinstance(params, dict):
@@ -2238,114 +2787,345 @@ class MOLTVILLESkill:
             return {"type": "wait", "params": {}}
         return None
 
-    async def _call_llm_json(self, prompt: str, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        llm_config = self.config.get("llm", {})
+    def _llm_ready(self, llm_config: Dict[str, Any]) -> bool:
         provider = llm_config.get("provider", "")
-        api_key = llm_config.get("apiKey", "")
         model = llm_config.get("model", "")
         if not (provider and model):
-            return None
-        if provider not in ("ollama",) and not api_key:
-            return None
+            return False
+        if provider not in ("ollama",) and not llm_config.get("apiKey", ""):
+            return False
+        return True
 
+    def _llm_max_tokens(self, llm_config: Dict[str, Any], kind: str) -> int:
+        by_kind = llm_config.get("maxTokensByKind") if isinstance(llm_config.get("maxTokensByKind"), dict) else {}
+        defaults = {"social": 160, "relationship": 400, "profile": 600}
+        value = by_kind.get(kind, defaults.get(kind, llm_config.get("maxTokens", 300)))
         try:
-            if provider == "openai":
-                url = "https://api.openai.com/v1/chat/completions"
-                headers = {"Authorization": f"Bearer {api_key}"}
-                body = {
-                    "model": model,
-                    "messages": [
-                        {"role": "system", "content": prompt},
-                        {"role": "user", "content": json.dumps(payload)}
-                    ],
-                    "temperature": llm_config.get("temperature", 0.4)
+            return max(16, int(value))
+        except (TypeError, ValueError):
+            return 300
+
+    def _llm_config_for(self, kind: str) -> Tuple[Dict[str, Any], Optional[str]]:
+        """Resolve the effective LLM config for a call kind: routed tier, or the fast tier when the routed one is too slow."""
+        llm_cfg = self.config.get("llm", {}) if isinstance(self.config.get("llm"), dict) else {}
+        tiers = llm_cfg.get("tiers") if isinstance(llm_cfg.get("tiers"), dict) else {}
+        if not tiers:
+            return llm_cfg, None
+        base = {key: value for key, value in llm_cfg.items() if key not in ("tiers", "routing", "fallback")}
+        routing = llm_cfg.get("routing") if isinstance(llm_cfg.get("routing"), dict) else {}
+        tier = routing.get(kind, routing.get("default"))
+        if tier not in tiers:
+            return base, None
+        resolved = {**base, **(tiers[tier] if isinstance(tiers[tier], dict) else {})}
+        fallback = llm_cfg.get("fallback") if isinstance(llm_cfg.get("fallback"), dict) else {}
+        fallback_tier = fallback.get("tier")
+        limits = fallback.get("p90Ms")
+        limit = limits.get(kind) if isinstance(limits, dict) else limits
+        if fallback_tier in tiers and fallback_tier != tier and isinstance(limit, (int, float)):
+            # Only recent samples count: while falling back the primary gets one probe per probeSec,
+            # so a long window of old slow calls would keep it out long after it recovered.
+            p90 = self._llm_telemetry.model_latency_percentile(
+                str(resolved.get("model")),
+                0.9,
+                int(fallback.get("minSamples", 5)),
+                max_age_sec=float(fallback.get("windowSec", 180)),
+                last=int(fallback.get("windowSamples", 20))
+            )
+            if p90 is not None and p90 > limit:
+                now = asyncio.get_event_loop().time()
+                probe_every = float(fallback.get("probeSec", 60))
+                if now - self._llm_probe_at.get(tier, 0.0) >= probe_every:
+                    # Let one call through now and then so a recovered primary gets fresh samples.
+                    self._llm_probe_at[tier] = now
+                    self._llm_routing_metrics["probes"] += 1
+                else:
+                    self._llm_routing_metrics["fallbacks"] += 1
+                    self._log_cycle("llm_tier_fallback", kind=kind, tier=tier, fallbackTier=fallback_tier, p90Ms=p90, limitMs=limit)
+                    tier = fallback_tier
+                    resolved = {**base, **(tiers[tier] if isinstance(tiers[tier], dict) else {})}
+        by_tier = self._llm_routing_metrics["byTier"]
+        by_tier[tier] = by_tier.get(tier, 0) + 1
+        return resolved, tier
+
+    def _build_llm_request(
+        self,
+        llm_config: Dict[str, Any],
+        prompt: str,
+        user_content: str,
+        schema: Optional[Dict[str, Any]] = None,
+        max_tokens: int = 300,
+        history: Optional[List[Dict[str, str]]] = None
+    ) -> Optional[Tuple[str, Dict[str, str], Dict[str, Any]]]:
+        provider = llm_config.get("provider", "")
+        api_key = llm_config.get("apiKey", "")
+        model = llm_config.get("model", "")
+        structured = bool(llm_config.get("structuredOutput", True))
+        turns = [*(history or []), {"role": "user", "content": user_content}]
+        if provider == "openai":
+            url = "https://api.openai.com/v1/chat/completions"
+            headers = {"Authorization": f"Bearer {api_key}"}
+            body = {
+                "model": model,
+                "messages": [{"role": "system", "content": prompt}, *turns],
+                "temperature": llm_config.get("temperature", 0.4),
+                "max_tokens": max_tokens
+            }
+            if structured and schema:
+                body["response_format"] = {
+                    "type": "json_schema",
+                    "json_schema": {"name": "moltville_response", "schema": schema, "strict": False}
                 }
-            elif provider == "anthropic":
+            elif structured:
+                body["response_format"] = {"type": "json_object"}
+        elif provider in ("anthropic", "minimax-portal"):
+            if provider == "anthropic":
                 url = "https://api.anthropic.com/v1/messages"
-                headers = {
-                    "x-api-key": api_key,
-                    "anthropic-version": "2023-06-01"
-                }
-                body = {
-                    "model": model,
-                    "system": prompt,
-                    "messages": [{"role": "user", "content": json.dumps(payload)}],
-                    "max_tokens": llm_config.get("maxTokens", 300)
-                }
-            elif provider == "minimax-portal":
+            else:
                 base_url = llm_config.get("baseUrl", "https://api.minimax.io/anthropic")
                 url = f"{base_url.rstrip('/')}/v1/messages"
-                headers = {
-                    "x-api-key": api_key,
-                    "anthropic-version": "2023-06-01"
-                }
-                body = {
-                    "model": model,
-                    "system": prompt,
-                    "messages": [{"role": "user", "content": json.dumps(payload)}],
-                    "max_tokens": llm_config.get("maxTokens", 300)
-                }
-            elif provider == "ollama":
-                base_url = llm_config.get("baseUrl", "http://localhost:11434")
-                url = f"{base_url.rstrip('/')}/v1/chat/completions"
-                headers = {"Content-Type": "application/json"}
-                body = {
-                    "model": model,
-                    "messages": [
-                        {"role": "system", "content": prompt},
-                        {"role": "user", "content": json.dumps(payload)}
-                    ],
-                    "temperature": llm_config.get("temperature", 0.4)
-                }
-            elif provider == "qwen-oauth":
-                base_url = llm_config.get("baseUrl", "https://portal.qwen.ai/v1")
-                url = f"{base_url.rstrip('/')}/chat/completions"
-                model_name = model.split('/')[-1] if model else "coder-model"
-                if model_name not in ("coder-model", "vision-model"):
-                    model_name = "coder-model"
-                headers = {
-                    "Content-Type": "application/json",
-                    "Accept": "application/json",
-                    "Authorization": f"Bearer {api_key}",
-                    "X-DashScope-AuthType": "qwen_oauth"
-                }
-                body = {
-                    "model": model_name,
-                    "messages": [
-                        {"role": "system", "content": prompt},
-                        {"role": "user", "content": json.dumps(payload)}
-                    ],
-                    "temperature": llm_config.get("temperature", 0.4)
+            headers = {
+                "x-api-key": api_key,
+                "anthropic-version": "2023-06-01"
+            }
+            messages = list(turns)
+            if structured:
+                # No schema mode on the Messages API: prefill the opening brace so the reply is bare JSON.
+                messages.append({"role": "assistant", "content": "{"})
+            body = {
+                "model": model,
+                "system": prompt,
+                "messages": messages,
+                "max_tokens": max_tokens
+            }
+        elif provider == "ollama":
+            base_url = llm_config.get("baseUrl", "http://localhost:11434")
+            url = f"{base_url.rstrip('/')}/api/chat"
+            headers = {"Content-Type": "application/json"}
+            body = {
+                "model": model,
+                "messages": [{"role": "system", "content": prompt}, *turns],
+                "stream": False,
+                "options": {
+                    "temperature": llm_config.get("temperature", 0.4),
+                    "num_predict": max_tokens
                 }
-            else:
-                return None
+            }
+            if structured:
+                body["format"] = schema or "json"
+            if isinstance(llm_config.get("think"), bool):
+                body["think"] = llm_config["think"]
+            keep_alive = llm_config.get("keepAlive", "30m")
+            if keep_alive is not None:
+                # Keep the model (and its prompt cache) resident between decision cycles.
+                body["keep_alive"] = keep_alive
+        elif provider == "qwen-oauth":
+            base_url = llm_config.get("baseUrl", "https://portal.qwen.ai/v1")
+            url = f"{base_url.rstrip('/')}/chat/completions"
+            model_name = model.split('/')[-1] if model else "coder-model"
+            if model_name not in ("coder-model", "vision-model"):
+                model_name = "coder-model"
+            headers = {
+                "Content-Type": "application/json",
+                "Accept": "application/json",
+                "Authorization": f"Bearer {api_key}",
+                "X-DashScope-AuthType": "qwen_oauth"
+            }
+            body = {
+                "model": model_name,
+                "messages": [{"role": "system", "content": prompt}, *turns],
+                "temperature": llm_config.get("temperature", 0.4),
+                "max_tokens": max_tokens
+            }
+            if structured:
+                body["response_format"] = {"type": "json_object"}
+        else:
+            return None
+        return url, headers, body
+
+    def _extract_llm_content(self, provider: str, data: Dict[str, Any]) -> Optional[str]:
+        if provider == "ollama":
+            return (data.get("message") or {}).get("content")
+        if provider in ("openai", "qwen-oauth"):
+            return data.get("choices", [{}])[0].get("message", {}).get("content")
+        if provider in ("anthropic", "minimax-portal"):
+            parts = data.get("content", [])
+            if parts:
+                return parts[0].get("text")
+        return None
 
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=float(llm_config.get("timeoutSec", 20)))) as session:
+    def _llm_backend_key(self, url: str) -> str:
+        # One concurrency budget per host: every path on the same server shares its capacity.
+        parts = url.split("/")
+        return "/".join(parts[:3]) if len(parts) >= 3 else url
+
+    def _record_llm_usage(self, call: Dict[str, Any], data: Dict[str, Any]) -> None:
+        usage = data.get("usage") if isinstance(data.get("usage"), dict) else {}
+        prompt_tokens = usage.get("prompt_tokens", usage.get("input_tokens", data.get("prompt_eval_count")))
+        completion_tokens = usage.get("completion_tokens", usage.get("output_tokens", data.get("eval_count")))
+        if isinstance(prompt_tokens, int):
+            call["promptTokens"] = prompt_tokens
+        if isinstance(completion_tokens, int):
+            call["completionTokens"] = completion_tokens
+
+    def _llm_pool_for(self, llm_config: Dict[str, Any]) -> Optional[BackendPool]:
+        backends = llm_config.get("backends")
+        if not isinstance(backends, list):
+            return None
+        urls = tuple(
+            str(item.get("baseUrl") if isinstance(item, dict) else item).rstrip("/")
+            for item in backends
+            if (item.get("baseUrl") if isinstance(item, dict) else item)
+        )
+        if len(urls) < 2:
+            return None
+        pool = self._llm_pools.get(urls)
+        if pool is None:
+            health_cfg = llm_config.get("healthCheck") if isinstance(llm_config.get("healthCheck"), dict) else {}
+            default_path = "/api/tags" if llm_config.get("provider") == "ollama" else None
+            pool = BackendPool(
+                urls,
+                health_path=health_cfg.get("path", default_path),
+                health_interval_sec=float(health_cfg.get("intervalSec", 15)),
+                fail_threshold=int(health_cfg.get("failThreshold", 2)),
+                cooldown_sec=float(health_cfg.get("cooldownSec", 30))
+            )
+            self._llm_pools[urls] = pool
+        return pool
+
+    async def _post_llm(
+        self,
+        kind: str,
+        llm_config: Dict[str, Any],
+        prompt: str,
+        user_content: str,
+        call: Optional[Dict[str, Any]] = None,
+        schema: Optional[Dict[str, Any]] = None,
+        history: Optional[List[Dict[str, str]]] = None
+    ) -> Optional[str]:
+        """Send one chat request, spread over ``llm.backends`` (with optional hedging) when configured."""
+        if call is None:
+            call = self._llm_telemetry.begin(kind, llm_config.get("model"))
+        pool = self._llm_pool_for(llm_config)
+        if pool is None:
+            return await self._send_llm(kind, llm_config, prompt, user_content, call, schema, history)
+
+        attempts: List[str] = []
+
+        async def attempt(base_url: str) -> Tuple[Optional[str], Dict[str, Any]]:
+            attempts.append(base_url)
+            scratch: Dict[str, Any] = {"_t0": call["_t0"]}
+            content = await self._send_llm(kind, {**llm_config, "baseUrl": base_url}, prompt, user_content, scratch, schema, history)
+            return content, scratch
+
+        hedge_ms = llm_config.get("hedgeAfterMs")
+        hedge_kinds = llm_config.get("hedgeKinds", ["conversation", "decision"])
+        hedge_after = float(hedge_ms) / 1000 if isinstance(hedge_ms, (int, float)) and kind in hedge_kinds else None
+        _, result = await pool.run(
+            attempt,
+            hedge_after,
+            is_ok=lambda value: value[0] is not None,
+            is_error=lambda value: value[1].get("outcome") in ("http_error", "transport_error")
+        )
+        content, scratch = result if result else (None, {})
+        call.update(scratch)
+        call["attempts"] = len(attempts)
+        return content
+
+    async def _send_llm(
+        self,
+        kind: str,
+        llm_config: Dict[str, Any],
+        prompt: str,
+        user_content: str,
+        call: Dict[str, Any],
+        schema: Optional[Dict[str, Any]] = None,
+        history: Optional[List[Dict[str, str]]] = None
+    ) -> Optional[str]:
+        """Send one chat request through the LLM scheduler and return the raw text content."""
+        request = self._build_llm_request(llm_config, prompt, user_content, schema, self._llm_max_tokens(llm_config, kind), history)
+        if not request:
+            return None
+        url, headers, body = request
+        backend = self._llm_backend_key(url)
+        call["backend"] = backend
+        if expired(0.05):
+            call["outcome"] = "deadline"
+            return None
+        call["promptBytes"] = len(prompt.encode("utf-8")) + len(user_content.encode("utf-8")) + sum(
+            len(str(turn.get("content", "")).encode("utf-8")) for turn in history or []
+        )
+        async with self._llm_scheduler.slot(kind, backend, bounded(self._llm_scheduler.deadline_for(kind))) as ticket:
+            call["waitMs"] = ticket.get("waitMs")
+            if not ticket.get("granted"):
+                call["outcome"] = "dropped"
+                self._log_cycle("llm_dropped", kind=kind, backend=backend, reason=ticket.get("reason"), waitMs=ticket.get("waitMs"))
+                return None
+            if ticket.get("waitMs", 0) >= 1:
+                self._log_cycle("llm_queue_wait", kind=kind, backend=backend, waitMs=ticket.get("waitMs"))
+            timeout = aiohttp.ClientTimeout(total=bounded(float(llm_config.get("timeoutSec", 20))))
+            async with aiohttp.ClientSession(timeout=timeout) as session:
+                self._llm_telemetry.mark_sent(call)
                 async with session.post(url, json=body, headers=headers) as response:
-                    data = await response.json()
+                    self._llm_telemetry.mark_first_byte(call)
+                    raw = await response.read()
+                    self._llm_telemetry.mark_done(call)
+                    call["status"] = response.status
+                    call["completionBytes"] = len(raw)
+                    try:
+                        data = json.loads(raw)
+                    except ValueError:
+                        data = None
                     if response.status >= 400:
-                        logger.warning(f"LLM error: {data}")
+                        call["outcome"] = "http_error"
+                        logger.warning(f"LLM error: {data if data is not None else raw[:300]!r}")
+                        return None
+                    if not isinstance(data, dict):
+                        call["outcome"] = "transport_error"
+                        logger.warning(f"LLM returned a non-JSON envelope: {raw[:300]!r}")
                         return None
-            content = None
-            if provider in ("openai", "ollama", "qwen-oauth"):
-                content = data.get("choices", [{}])[0].get("message", {}).get("content")
-            elif provider in ("anthropic", "minimax-portal"):
-                parts = data.get("content", [])
-                if parts:
-                    content = parts[0].get("text")
+        self._record_llm_usage(call, data)
+        content = self._extract_llm_content(llm_config.get("provider", ""), data)
+        prefill = body.get("messages", [{}])[-1]
+        if content and prefill.get("role") == "assistant" and not content.lstrip().startswith(prefill.get("content", "")):
+            content = prefill.get("content", "") + content
+        return content
+
+    async def _call_llm_json(self, prompt: str, payload: Dict[str, Any], kind: str = "social", schema: str = "message") -> Optional[Dict[str, Any]]:
+        """Structured LLM call; only ``schema="action"`` results are sanitized and validated as actions."""
+        llm_config, tier = self._llm_config_for(kind)
+        if not self._llm_ready(llm_config):
+            return None
+
+        call = self._llm_telemetry.begin(kind, llm_config.get("model"), tier)
+        try:
+            content = await self._post_llm(kind, llm_config, prompt, render_payload(payload), call=call, schema=SCHEMAS.get(schema))
             if not content:
+                self._llm_telemetry.finish(call, "empty")
+                return None
+            try:
+                parsed = json.loads(content)
+            except json.JSONDecodeError as error:
+                self._llm_telemetry.finish(call, "parse_failure", str(error))
+                logger.warning(f"LLM {kind} response is not JSON: {content[:300]}")
                 return None
-            parsed = json.loads(content)
             if not isinstance(parsed, dict):
+                self._llm_telemetry.finish(call, "parse_failure", "not an object")
                 return None
+            if schema != "action":
+                self._llm_telemetry.finish(call, "ok")
+                return parsed
             sanitized = self._sanitize_llm_action(parsed)
             if not sanitized:
+                self._llm_telemetry.finish(call, "sanitize_rejected", str(parsed.get("type")))
                 return None
             current_step = self._current_step()
             if not self._validate_action_with_step(sanitized, current_step):
+                self._llm_telemetry.finish(call, "validation_rejected", str(sanitized.get("type")))
                 return None
+            self._llm_telemetry.finish(call, "ok")
             return sanitized
-        except (OSError, json.JSONDecodeError, aiohttp.ClientError) as error:
+        except (OSError, asyncio.TimeoutError, aiohttp.ClientError) as error:
+            self._llm_telemetry.finish(call, "deadline" if expired(0.05) else "transport_error", f"{type(error).__name__}: {error}")
             logger.warning(
                 "LLM decision failed: type=%s repr=%r",
                 type(error).__name__,
@@ -2353,15 +3133,48 @@ class MOLTVILLESkill:
             )
             logger.debug("LLM decision traceback", exc_info=True)
             return None
+        except asyncio.CancelledError:
+            self._llm_telemetry.finish(call, "cancelled")
+            raise
+        finally:
+            # An unexpected error still leaves a trace line.
+            self._llm_telemetry.finish(call, "transport_error")
+
+    def _recall_episodes(
+        self,
+        current_step: Optional[Dict[str, Any]],
+        required_outcome: Optional[str],
+        conv_messages: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Older episodes relevant to the current step and conversation, beyond the recent ones already sent."""
+        index = self._episode_index()
+        if index is None:
+            return []
+        parts = []
+        if isinstance(current_step, dict):
+            parts.extend(str(current_step.get(key) or "").replace("_", " ") for key in ("id", "label"))
+        parts.append(str(required_outcome or ""))
+        for message in conv_messages[-3:]:
+            parts.extend([str(message.get("from") or ""), str(message.get("message") or "")])
+        query = " ".join(part for part in parts if part)
+        if not query:
+            return []
+        recent = {id(entry) for entry in self.long_memory["episodes"].tail(6)}
+        return [
+            {**entry.to_json(), "score": score}
+            for entry, score in index.query(query, k=self._recall_top_k, exclude=recent)
+        ]
+
+    def _conversation_messages(self, perception: Dict[str, Any], conv_id: Optional[str]) -> List[Dict[str, Any]]:
+        convs = perception.get("conversations", []) if isinstance(perception, dict) else []
+        conv = next((c for c in convs or [] if isinstance(c, dict) and c.get("id") == conv_id), None)
+        messages = conv.get("messages", []) if isinstance(conv, dict) else []
+        return sorted((m for m in messages or [] if isinstance(m, dict)), key=lambda m: m.get("timestamp", 0))
 
     async def _decide_with_llm(self, perception: Dict[str, Any], force_conversation: bool = False, forced_conversation_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
-        llm_config = self.config.get("llm", {})
-        provider = llm_config.get("provider", "")
-        api_key = llm_config.get("apiKey", "")
-        model = llm_config.get("model", "")
-        if not (provider and model):
-            return None
-        if provider not in ("ollama",) and not api_key:
+        kind = "conversation" if force_conversation else "decision"
+        llm_config, tier = self._llm_config_for(kind)
+        if not self._llm_ready(llm_config):
             return None
 
         self._prune_goals()
@@ -2390,6 +3203,23 @@ class MOLTVILLESkill:
             "forcedConversationId": forced_conversation_id,
             "jobApplications": job_applications
         }
+        conv_messages = self._conversation_messages(perception, forced_conversation_id) if forced_conversation_id else []
+        if force_conversation and self._memory_store is not None:
+            partner = next((m.get("from") for m in conv_messages if m.get("from") and m.get("from") != self.agent_id), None)
+            if partner:
+                # Older things this partner told us, beyond the 80 episodes kept in memory.
+                try:
+                    past = self._memory_store.utterances_from(partner, limit=8)
+                except sqlite3.Error as error:
+                    logger.warning(f"Memory store query failed: {error}")
+                    past = []
+                payload["pastWithSpeaker"] = [
+                    entry.get("data", {}).get("message") for entry in past
+                    if entry.get("data", {}).get("conversationId") != forced_conversation_id
+                ]
+        recalled = self._recall_episodes(current_step, payload.get("requiredOutcome"), conv_messages)
+        if recalled:
+            payload["recalled"] = recalled
         prompt = (
             "Eres un ciudadano de MOLTVILLE. ActÃºas solo dentro del mundo, en primera persona. "
             "Nunca menciones IA, modelos, sistemas, pruebas, servidores ni infraestructura. "
@@ -2416,91 +3246,28 @@ class MOLTVILLESkill:
                 "Devuelve SOLO JSON vÃ¡lido con: {\"type\": \"conversation_message|end_conversation\", \"params\": {\"conversation_id\": \"...\", \"message\": \"...\"}, \"nextStep\": {\"type\": \"move_to|enter_building|wait\", \"params\": {...}}}."
             )
 
+        schema = action_schema(("conversation_message", "end_conversation")) if force_conversation else SCHEMAS["action"]
+        user_content = render_payload(payload)
+        history = None
+        anchor = render_payload({key: payload.get(key) for key in PERSONA_KEYS})
+        history_entry = None
+        if force_conversation and forced_conversation_id and self._llm_history_enabled:
+            history_entry = self._llm_history.get(forced_conversation_id, anchor)
+        if history_entry is not None and conv_messages:
+            # The model already saw the persona and earlier turns; send only what changed.
+            history = history_entry["messages"]
+            user_content = render_payload({
+                "currentStep": current_step,
+                "requiredOutcome": payload.get("requiredOutcome"),
+                "forcedConversationId": forced_conversation_id,
+                "newMessages": [m for m in conv_messages if m.get("timestamp", 0) > history_entry["seenTs"]]
+            })
+        call = self._llm_telemetry.begin(kind, llm_config.get("model"), tier)
+        call["historyTurns"] = len(history or []) // 2
         try:
-            if provider == "openai":
-                url = "https://api.openai.com/v1/chat/completions"
-                headers = {"Authorization": f"Bearer {api_key}"}
-                body = {
-                    "model": model,
-                    "messages": [
-                        {"role": "system", "content": prompt},
-                        {"role": "user", "content": json.dumps(payload)}
-                    ],
-                    "temperature": llm_config.get("temperature", 0.4)
-                }
-            elif provider == "anthropic":
-                url = "https://api.anthropic.com/v1/messages"
-                headers = {
-                    "x-api-key": api_key,
-                    "anthropic-version": "2023-06-01"
-                }
-                body = {
-                    "model": model,
-                    "system": prompt,
-                    "messages": [{"role": "user", "content": json.dumps(payload)}],
-                    "max_tokens": llm_config.get("maxTokens", 300)
-                }
-            elif provider == "minimax-portal":
-                base_url = llm_config.get("baseUrl", "https://api.minimax.io/anthropic")
-                url = f"{base_url.rstrip('/')}/v1/messages"
-                headers = {
-                    "x-api-key": api_key,
-                    "anthropic-version": "2023-06-01"
-                }
-                body = {
-                    "model": model,
-                    "system": prompt,
-                    "messages": [{"role": "user", "content": json.dumps(payload)}],
-                    "max_tokens": llm_config.get("maxTokens", 300)
-                }
-            elif provider == "ollama":
-                url = "http://localhost:11434/v1/chat/completions"
-                headers = {"Content-Type": "application/json"}
-                body = {
-                    "model": model,
-                    "messages": [
-                        {"role": "system", "content": prompt},
-                        {"role": "user", "content": json.dumps(payload)}
-                    ],
-                    "temperature": llm_config.get("temperature", 0.4)
-                }
-            elif provider == "qwen-oauth":
-                base_url = llm_config.get("baseUrl", "https://portal.qwen.ai/v1")
-                url = f"{base_url.rstrip('/')}/chat/completions"
-                model_name = model.split('/')[-1] if model else "coder-model"
-                if model_name not in ("coder-model", "vision-model"):
-                    model_name = "coder-model"
-                headers = {
-                    "Content-Type": "application/json",
-                    "Accept": "application/json",
-                    "Authorization": f"Bearer {api_key}",
-                    "X-DashScope-AuthType": "qwen_oauth"
-                }
-                body = {
-                    "model": model_name,
-                    "messages": [
-                        {"role": "system", "content": prompt},
-                        {"role": "user", "content": json.dumps(payload)}
-                    ],
-                    "temperature": llm_config.get("temperature", 0.4)
-                }
-            else:
-                return None
-
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=float(llm_config.get("timeoutSec", 20)))) as session:
-                async with session.post(url, json=body, headers=headers) as response:
-                    data = await response.json()
-                    if response.status >= 400:
-                        logger.warning(f"LLM error: {data}")
-                        return None
-            content = None
-            if provider == "openai" or provider == "ollama" or provider == "qwen-oauth":
-                content = data.get("choices", [{}])[0].get("message", {}).get("content")
-            elif provider == "anthropic" or provider == "minimax-portal":
-                parts = data.get("content", [])
-                if parts:
-                    content = parts[0].get("text")
+            content = await self._post_llm(kind, llm_config, prompt, user_content, call=call, schema=schema, history=history)
             if not content:
+                self._llm_telemetry.finish(call, "empty")
                 return None
             try:
                 parsed = json.loads(content)
@@ -2510,9 +3277,17 @@ class MOLTVILLESkill:
                 end = content.rfind('}')
                 if start != -1 and end != -1 and end > start:
                     snippet = content[start:end + 1]
-                    parsed = json.loads(snippet)
+                    try:
+                        parsed = json.loads(snippet)
+                    except json.JSONDecodeError as error:
+                        self._llm_telemetry.finish(call, "parse_failure", str(error))
+                        logger.warning(f"LLM raw: {content[:500]}")
+                        return None
+                    self._llm_telemetry.note_parse_recovered(call)
                 else:
-                    raise
+                    self._llm_telemetry.finish(call, "parse_failure", "no JSON object")
+                    logger.warning(f"LLM raw: {content[:500]}")
+                    return None
             if force_conversation and isinstance(parsed, dict) and parsed.get("type") == "conversation_message":
                 params = parsed.get("params") if isinstance(parsed.get("params"), dict) else {}
                 if forced_conversation_id and not params.get("conversation_id") and not params.get("conversationId"):
@@ -2520,10 +3295,22 @@ class MOLTVILLESkill:
                     parsed["params"] = params
             sanitized = self._sanitize_llm_action(parsed)
             if not sanitized:
+                self._llm_telemetry.finish(call, "sanitize_rejected", str(parsed.get("type")) if isinstance(parsed, dict) else type(parsed).__name__)
                 logger.warning("LLM returned invalid action.")
                 logger.warning(f"LLM raw: {content[:500]}")
+            else:
+                self._llm_telemetry.finish(call, "ok")
+                if force_conversation and forced_conversation_id and self._llm_history_enabled and conv_messages:
+                    self._llm_history.record(
+                        forced_conversation_id,
+                        anchor,
+                        user_content,
+                        content,
+                        max(m.get("timestamp", 0) for m in conv_messages)
+                    )
             return sanitized
-        except (OSError, json.JSONDecodeError, aiohttp.ClientError) as error:
+        except (OSError, asyncio.TimeoutError, aiohttp.ClientError) as error:
+            self._llm_telemetry.finish(call, "deadline" if expired(0.05) else "transport_error", f"{type(error).__name__}: {error}")
             logger.warning(
                 "LLM decision failed: type=%s repr=%r",
                 type(error).__name__,
@@ -2531,6 +3318,11 @@ class MOLTVILLESkill:
             )
             logger.debug("LLM decision traceback", exc_info=True)
             return None
+        except asyncio.CancelledError:
+            self._llm_telemetry.finish(call, "cancelled")
+            raise
+        finally:
+            self._llm_telemetry.finish(call, "transport_error")
 
     async def _social_initiation_action(self, target_id: str, target_name: str, step: Optional[Dict]) -> Optional[Dict[str, Any]]:
         """
@@ -2566,7 +3358,7 @@ class MOLTVILLESkill:
             "miPasoActual": step_label,
             "misRasgos": {k: round(v, 2) for k, v in list(self._traits.items())[:4]},
             "otraCiudadana": target_name,
-            "contextoPrevio": [u.get("message", "") for u in self._recent_utterances[-2:]],
+            "contextoPrevio": [u.message for u in self._recent_utterances.tail(2)],
         }
         try:
             result = await self._call_llm_json(prompt, payload)
@@ -2700,18 +3492,20 @@ class MOLTVILLESkill:
             "y": int(position.get("y", 0) + max(height, 1))
         }
 
-    async def _execute_action(self, action: Dict[str, Any]) -> None:
+    async def _execute_action(self, action: Dict[str, Any], decided_at: Optional[float] = None) -> None:
+        """Run ``action``; ``decided_at`` (loop time) is when it was chosen, for latency tracking."""
         if not action or not isinstance(action, dict):
             return
-        try:
-            await asyncio.wait_for(self._action_lock.acquire(), timeout=self._action_lock_timeout)
-        except asyncio.TimeoutError:
+        resources = action_resources(action)
+        if not await self._action_locks.acquire(resources, timeout=self._action_lock_timeout):
             self._enqueue_action(action, source="action_lock_timeout", priority=1.8)
-            self._log_cycle("action_skip", reason="action_lock_timeout", action=action.get("type"))
+            self._log_cycle("action_skip", reason="action_lock_timeout", action=action.get("type"), resources=sorted(resources))
             return
 
         action_type = action.get("type")
         params = action.get("params", {}) or {}
+        action_id = self._action_tracker.start(str(action_type or ""), params, decided_at)
+        result: Any = {"error": "unsupported_action"}
         try:
             self._update_cognition(
                 internal=self._infer_internal_thought(str(action_type or ""), params),
@@ -2719,6 +3513,7 @@ class MOLTVILLESkill:
             )
             await self.sio.emit('telemetry:action', {
                 'event': 'agent_action',
+                'actionId': action_id,
                 'actionType': action_type,
                 'params': params,
                 'reason': (self._motivation_state.get('desire') if isinstance(self._motivation_state, dict) else None)
@@ -2728,15 +3523,17 @@ class MOLTVILLESkill:
                 x = params.get("x")
                 y = params.get("y")
                 if isinstance(x, (int, float)) and isinstance(y, (int, float)):
-                    await self.move_to(x, y)
+                    result = await self.move_to(x, y)
+                else:
+                    result = {"error": "invalid_target"}
             elif action_type == "create_event":
-                await self.create_event(params)
+                result = await self.create_event(params)
             elif action_type == "join_event":
-                await self.join_event(params.get("event_id") or params.get("eventId"))
+                result = await self.join_event(params.get("event_id") or params.get("eventId"))
             elif action_type == "enter_building":
-                await self.enter_building(params.get("building_id"))
+                result = await self.enter_building(params.get("building_id"))
             elif action_type == "speak":
-                await self.speak(params.get("message", ""))
+                result = await self.speak(params.get("message", ""))
             elif action_type == "start_conversation":
                 target_id = params.get("target_id")
                 message = params.get("message", "")
@@ -2750,6 +3547,7 @@ class MOLTVILLESkill:
                 )
             elif action_type == "conversation_message":
                 cid = params.get("conversation_id")
+                result = {"error": "missing_conversation_id"}
                 if cid:
                     result = await self.send_conversation_message(cid, params.get("message", ""))
                     self._log_cycle(
@@ -2760,8 +3558,9 @@ class MOLTVILLESkill:
                     )
             elif action_type == "end_conversation":
                 cid = params.get("conversation_id")
+                result = {"error": "missing_conversation_id"}
                 if cid:
-                    await self._http_request("POST", f"/api/moltbot/{self.agent_id}/conversations/{cid}/end")
+                    result = await self._http_request("POST", f"/api/moltbot/{self.agent_id}/conversations/{cid}/end")
             elif action_type == "apply_job":
                 result = await self.apply_job(params.get("job_id"))
                 if isinstance(result, dict) and result.get("error"):
@@ -2769,25 +3568,26 @@ class MOLTVILLESkill:
                     if isinstance(recovery, dict):
                         self._enqueue_action(recovery, source="job_recovery", priority=1.6)
             elif action_type == "buy_property":
-                await self.buy_property(params.get("property_id"))
+                result = await self.buy_property(params.get("property_id"))
             elif action_type == "vote_job":
-                await self.vote_job(params.get("applicant_id"), params.get("job_id"))
+                result = await self.vote_job(params.get("applicant_id"), params.get("job_id"))
             elif action_type == "coord_create_proposal":
-                await self.create_coordination_proposal(params.get("title"), params.get("description", ""), params.get("category", "community"), params.get("required_roles") or [])
+                result = await self.create_coordination_proposal(params.get("title"), params.get("description", ""), params.get("category", "community"), params.get("required_roles") or [])
             elif action_type == "coord_join":
-                await self.join_coordination_proposal(params.get("proposal_id"), params.get("role", "participant"))
+                result = await self.join_coordination_proposal(params.get("proposal_id"), params.get("role", "participant"))
             elif action_type == "coord_commit":
-                await self.commit_coordination_task(params.get("proposal_id"), params.get("task", "support_proposal"), params.get("role", "participant"))
+                result = await self.commit_coordination_task(params.get("proposal_id"), params.get("task", "support_proposal"), params.get("role", "participant"))
             elif action_type == "coord_update_commit":
-                await self.update_coordination_commitment(params.get("proposal_id"), params.get("commitment_id"), status=params.get("status"), progress=params.get("progress"), notes=params.get("notes", ""))
+                result = await self.update_coordination_commitment(params.get("proposal_id"), params.get("commitment_id"), status=params.get("status"), progress=params.get("progress"), notes=params.get("notes", ""))
             elif action_type == "coord_set_status":
-                await self.set_coordination_status(params.get("proposal_id"), status=params.get("status", "done"), summary=params.get("summary", ""))
+                result = await self.set_coordination_status(params.get("proposal_id"), status=params.get("status", "done"), summary=params.get("summary", ""))
+            self._action_tracker.complete(action_id, result)
 
             if isinstance(action_type, str) and action_type:
                 self._recent_action_types.append(action_type)
                 self._recent_action_types = self._recent_action_types[-12:]
             if isinstance(self._plan_state, dict):
-                self._plan_state["lastAction"] = {"type": action_type, "params": params}
+                self._plan_state["lastAction"] = {"id": action_id, "type": action_type, "params": params}
                 self._plan_state["lastActionAt"] = int(asyncio.get_event_loop().time() * 1000)
                 if isinstance(self.long_memory, dict):
                     self.long_memory["planState"] = self._plan_state
@@ -2797,11 +3597,11 @@ class MOLTVILLESkill:
         except Exception as error:
             self._update_health_metric("execute_action", ok=False)
             self._log_cycle("action_error", action=action_type, error=str(error))
+            self._action_tracker.fail(action_id, str(error))
             prio = 2.4 if action_type in ("apply_job", "buy_property", "vote_job", "coord_commit", "coord_update_commit") else 1.2
             self._enqueue_action(action, source="execute_error", priority=prio)
         finally:
-            if self._action_lock.locked():
-                self._action_lock.release()
+            self._action_locks.release(resources)
 
     async def connect_to_moltville(self) -> Dict[str, Any]:
         """
@@ -3289,12 +4089,39 @@ Be social, explore the city, and build relationships with other agents.
 """
         return prompt
     
+    async def get_metrics(self) -> Dict[str, Any]:
+        """
+        Snapshot of runtime metrics for the skill's internal subsystems
+
+        Returns:
+            Dictionary keyed by subsystem
+        """
+        return {
+            "agentId": self.agent_id,
+            "health": self._health_metrics,
+            "llmScheduler": self._llm_scheduler.snapshot(),
+            "llm": self._llm_telemetry.snapshot(),
+            "llmRouting": dict(self._llm_routing_metrics),
+            "llmBackends": {",".join(urls): pool.snapshot() for urls, pool in self._llm_pools.items()},
+            "relationshipScoring": dict(self._relation_metrics),
+            "conversationReplies": {**self._reply_metrics, "pending": len(self._reply_jobs)},
+            "decisionPreemption": {**self._preempt_metrics, "generation": self._decision_generation},
+            "decisionScheduler": self._decision_scheduler.snapshot(),
+            "memoryWriter": {**self._memory_writer.snapshot_metrics(), "journalPending": self._journal.pending},
+            "memoryStore": self._memory_store.snapshot() if self._memory_store else None,
+            "actionQueue": {**self._action_queue.metrics, "depth": self._action_queue.depth()},
+            "actionLocks": self._action_locks.snapshot(),
+            "actionOutcomes": self._action_tracker.snapshot(),
+            "memoryRetrieval": {**self._memory_index.metrics, "size": len(self._memory_index)} if self._memory_index is not None else None
+        }
+
     async def disconnect(self):
         """Disconnect from server"""
         if self.connected:
             await self.sio.disconnect()
             self.connected = False
             logger.info("Disconnected from MOLTVILLE")
+        await self._memory_writer.close()
 
 
 # Skill interface for OpenClaw
@@ -3349,6 +4176,7 @@ async def execute_command(skill: MOLTVILLESkill, command: str, params: Dict[str,
             params.get('quantity', 1)
         ),
         'get_prompt': lambda: {"prompt": skill.get_system_prompt()},
+        'metrics': skill.get_metrics,
         'disconnect': skill.disconnect
     }
     
@@ -0,0 +1,78 @@
+import json
+from typing import Any, Dict, Iterable, Optional
+
+# Payload keys in three tiers, from most to least stable: persona keys that stay fixed for the
+# whole session, plan/motivation/job state that changes every few minutes, and per-cycle context.
+# Keys not listed go between the last two tiers in alphabetical order, so every rendering of the
+# same content is byte-identical and local servers can reuse the KV cache for the unchanged prefix.
+STABLE_KEYS = ("agent", "self", "yo", "name", "personality_hint", "profile", "traits", "misRasgos")
+SESSION_KEYS = ("motivation", "miDeseo", "plan", "goals", "job", "jobId", "jobApplications")
+VOLATILE_KEYS = (
+    "currentStep", "miPasoActual", "requiredOutcome", "recentContext", "recalled", "contextoPrevio",
+    "activeConversations", "activeConversationsLive", "forcedConversationId", "speakers", "newMessages",
+    "events", "perception"
+)
+PERSONA_KEYS = ("agent", "profile", "traits")
+
+
+def _dump(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def render_payload(
+    payload: Dict[str, Any],
+    stable: Iterable[str] = STABLE_KEYS,
+    volatile: Iterable[str] = VOLATILE_KEYS,
+    session: Iterable[str] = SESSION_KEYS
+) -> str:
+    """Serialize ``payload`` as one JSON object, stable keys first and volatile keys last."""
+    stable = [key for key in stable if key in payload]
+    session = [key for key in session if key in payload and key not in stable]
+    listed = {*stable, *session}
+    volatile = [key for key in volatile if key in payload and key not in listed]
+    listed.update(volatile)
+    middle = sorted(key for key in payload if key not in listed)
+    parts = [f"{_dump(key)}:{_dump(payload[key])}" for key in (*stable, *session, *middle, *volatile)]
+    return "{" + ",".join(parts) + "}"
+
+
+class ConversationHistory:
+    """Per-conversation chat turns so replies send only what changed since the last turn."""
+
+    def __init__(self, max_turns: int = 12, max_conversations: int = 16):
+        self.max_turns = max(1, int(max_turns))
+        self.max_conversations = max(1, int(max_conversations))
+        self._entries: Dict[str, Dict[str, Any]] = {}
+
+    def get(self, conv_id: str, anchor: str) -> Optional[Dict[str, Any]]:
+        """History for ``conv_id`` if it was started with the same persona ``anchor``."""
+        entry = self._entries.get(conv_id)
+        if entry is None or entry["anchor"] != anchor:
+            return None
+        return entry
+
+    def record(self, conv_id: str, anchor: str, user_content: str, reply: str, seen_ts: Any) -> None:
+        entry = self.get(conv_id, anchor)
+        if entry is None:
+            entry = {"anchor": anchor, "messages": [], "seenTs": 0}
+            self._entries.pop(conv_id, None)
+            self._entries[conv_id] = entry
+            while len(self._entries) > self.max_conversations:
+                self._entries.pop(next(iter(self._entries)))
+        entry["messages"].extend([
+            {"role": "user", "content": user_content},
+            {"role": "assistant", "content": reply}
+        ])
+        entry["seenTs"] = seen_ts
+        if len(entry["messages"]) > self.max_turns * 2:
+            # Start over rather than trimming the front: a trimmed history changes the cached prefix anyway.
+            self._entries.pop(conv_id, None)
+
+    def reset(self, conv_id: Optional[str] = None) -> None:
+        if conv_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(conv_id, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
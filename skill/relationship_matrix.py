@@ -0,0 +1,131 @@
+import heapq
+from array import array
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+FIELDS = ("affinity", "trust", "respect")
+
+
+class RelationshipMatrix:
+    """Affinity/trust/respect per agent in contiguous columns, indexed by an agent-id table.
+
+    Updates are O(1) (amortized when the columns grow). Aggregate queries are vectorized
+    with NumPy when it is installed and fall back to loops over ``array`` columns otherwise.
+    """
+
+    def __init__(self, capacity: int = 64, use_numpy: Optional[bool] = None):
+        self.use_numpy = np is not None if use_numpy is None else bool(use_numpy and np is not None)
+        self.index: Dict[str, int] = {}
+        self.ids: List[str] = []
+        self._capacity = max(1, int(capacity))
+        if self.use_numpy:
+            self._data = np.zeros((len(FIELDS), self._capacity), dtype=np.float32)
+        else:
+            self._columns = [array("f", bytes(4 * self._capacity)) for _ in FIELDS]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, agent_id: str) -> bool:
+        return agent_id in self.index
+
+    def _grow(self) -> None:
+        self._capacity *= 2
+        if self.use_numpy:
+            grown = np.zeros((len(FIELDS), self._capacity), dtype=np.float32)
+            grown[:, :len(self.ids)] = self._data[:, :len(self.ids)]
+            self._data = grown
+        else:
+            for column in self._columns:
+                column.extend(array("f", bytes(4 * (self._capacity - len(column)))))
+
+    def set(self, agent_id: str, affinity: float, trust: float, respect: float) -> None:
+        slot = self.index.get(agent_id)
+        if slot is None:
+            if len(self.ids) >= self._capacity:
+                self._grow()
+            slot = len(self.ids)
+            self.index[agent_id] = slot
+            self.ids.append(agent_id)
+        if self.use_numpy:
+            self._data[:, slot] = (affinity, trust, respect)
+        else:
+            self._columns[0][slot] = affinity
+            self._columns[1][slot] = trust
+            self._columns[2][slot] = respect
+
+    def get(self, agent_id: str) -> Optional[Tuple[float, float, float]]:
+        slot = self.index.get(agent_id)
+        if slot is None:
+            return None
+        if self.use_numpy:
+            return tuple(float(value) for value in self._data[:, slot])
+        return tuple(column[slot] for column in self._columns)
+
+    def clear(self) -> None:
+        self.index.clear()
+        self.ids.clear()
+
+    def load(self, relationships: Mapping[str, Any]) -> None:
+        """Replace the contents with ``relationships`` (records or dicts with the three fields)."""
+        self.clear()
+        for agent_id, rel in relationships.items():
+            values = _values(rel)
+            if values is not None:
+                self.set(agent_id, *values)
+
+    def _scores(self) -> Iterable[float]:
+        count = len(self.ids)
+        if self.use_numpy:
+            return self._data[:, :count].sum(axis=0)
+        affinity, trust, respect = self._columns
+        return [affinity[i] + trust[i] + respect[i] for i in range(count)]
+
+    def max_score(self, default: float = 0.0) -> float:
+        """Highest affinity + trust + respect over all agents."""
+        if not self.ids:
+            return default
+        if self.use_numpy:
+            return float(self._scores().max())
+        return max(self._scores())
+
+    def approval_share(self, threshold: float = 2.0) -> float:
+        """Fraction of agents whose affinity or trust is at least ``threshold``."""
+        count = len(self.ids)
+        if not count:
+            return 0.0
+        if self.use_numpy:
+            approving = (self._data[0, :count] >= threshold) | (self._data[1, :count] >= threshold)
+            return float(approving.sum()) / count
+        affinity, trust, _ = self._columns
+        return sum(1 for i in range(count) if affinity[i] >= threshold or trust[i] >= threshold) / count
+
+    def top_k(self, k: int, absolute: bool = False) -> List[Tuple[str, float]]:
+        """The ``k`` agents with the highest combined score (or magnitude, with ``absolute``)."""
+        count = len(self.ids)
+        k = min(int(k), count)
+        if k <= 0:
+            return []
+        scores = self._scores()
+        if self.use_numpy:
+            keys = np.abs(scores) if absolute else scores
+            picked = np.argpartition(-keys, k - 1)[:k]
+            picked = picked[np.argsort(-keys[picked], kind="stable")]
+            return [(self.ids[i], float(scores[i])) for i in picked]
+        key = (lambda i: abs(scores[i])) if absolute else (lambda i: scores[i])
+        return [(self.ids[i], scores[i]) for i in heapq.nlargest(k, range(count), key=key)]
+
+
+def _values(rel: Any) -> Optional[Tuple[float, float, float]]:
+    if isinstance(rel, dict):
+        try:
+            return tuple(float(rel.get(field, 0) or 0) for field in FIELDS)
+        except (TypeError, ValueError):
+            return None
+    if all(hasattr(rel, field) for field in FIELDS):
+        return tuple(float(getattr(rel, field)) for field in FIELDS)
+    return None
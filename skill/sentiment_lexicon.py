@@ -0,0 +1,187 @@
+import math
+import re
+import unicodedata
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# Weighted cue terms (Spanish and English), accent-folded at compile time.
+# Entries ending in "*" match any token starting with the stem.
+DEFAULT_TERMS: Dict[str, float] = {
+    # Spanish, positive
+    "gracias": 1.5, "agradec*": 1.5, "genial": 2.0, "perfecto": 2.0, "perfecta": 2.0, "encant*": 2.0,
+    "bien": 1.0, "bueno": 1.0, "buena": 1.0, "buenisimo": 2.0, "excelente": 2.0, "claro": 0.6,
+    "amable": 1.5, "ayuda": 0.8, "ayudar*": 0.8, "acuerdo": 1.0, "confio": 1.8, "confianza": 1.2,
+    "feliz": 1.5, "gusta": 1.2, "amigo": 1.2, "amiga": 1.2, "apoyo": 1.2, "apoyar*": 1.2,
+    "increible": 1.8, "maravillos*": 2.0, "respeto": 1.2, "admir*": 1.5, "vale": 0.5, "estupendo": 1.8,
+    "bienvenid*": 1.2, "fantastic*": 2.0, "me alegra": 1.5, "alegr*": 1.2, "cuenta conmigo": 1.8,
+    # Spanish, negative ("odi*" and "engan*" stems would also catch "odisea" and "enganchado").
+    "mal": -1.2, "malo": -1.5, "mala": -1.5, "odio": -2.5, "odias": -2.0, "odia": -2.0, "odiar": -2.0,
+    "odiamos": -2.0, "odian": -2.0, "odiaba": -2.0, "odioso": -2.0, "odiosa": -2.0, "mentira": -2.0,
+    "mentiros*": -2.5, "molest*": -1.5, "terrible": -2.0, "horrible": -2.0, "estupid*": -2.5, "idiota": -2.5,
+    "tont*": -1.8, "basura": -2.0, "aburrid*": -1.0, "triste": -1.0, "enfadad*": -1.5, "enojad*": -1.5,
+    "traicion*": -2.5, "engano": -2.0, "enganos": -2.0, "enganar": -2.0, "enganas": -2.0, "engana": -2.0,
+    "enganan": -2.0, "enganaste": -2.0, "enganado": -2.0, "enganada": -2.0, "enganoso": -2.0, "enganosa": -2.0,
+    "robar": -2.0, "robo": -2.0, "desconfi*": -2.0, "largate": -2.0, "callate": -2.0,
+    "fraude": -2.0, "injust*": -1.5, "amenaz*": -2.0, "decepcion*": -1.8, "harto": -1.5, "harta": -1.5,
+    # English, positive
+    "thanks": 1.5, "thank": 1.5, "great": 2.0, "perfect": 2.0, "love": 2.0, "good": 1.0, "nice": 1.2,
+    "awesome": 2.0, "excellent": 2.0, "agree*": 1.0, "help*": 0.8, "trust": 1.5, "friend*": 1.2,
+    "happy": 1.5, "glad": 1.5, "sure": 0.6, "support*": 1.2, "kind": 1.2, "welcome": 1.0, "respect*": 1.2,
+    "admire": 1.5, "wonderful": 2.0, "amazing": 2.0, "count on me": 1.8,
+    # English, negative
+    "bad": -1.2, "hate*": -2.5, "lie": -2.0, "lies": -2.0, "liar": -2.5, "annoy*": -1.5, "awful": -2.0,
+    "stupid": -2.5, "idiot": -2.5, "boring": -1.0, "sad": -1.0, "angry": -1.5, "betray*": -2.5,
+    "scam*": -2.0, "steal*": -2.0, "cheat*": -2.0, "threat*": -2.0, "unfair": -1.5, "disappoint*": -1.8,
+    "shut up": -2.0, "go away": -1.5
+}
+
+NEGATORS = {
+    "no", "nunca", "jamas", "tampoco", "ni", "sin", "nada", "nadie",
+    "not", "never", "dont", "doesnt", "isnt", "wasnt", "cant", "wont", "nobody", "nothing", "without"
+}
+
+INTENSIFIERS: Dict[str, float] = {
+    "muy": 1.5, "super": 1.5, "tan": 1.3, "realmente": 1.4, "bastante": 1.2, "demasiado": 1.3,
+    "totalmente": 1.5, "sumamente": 1.7, "very": 1.5, "really": 1.4, "so": 1.3, "extremely": 1.8,
+    "totally": 1.5, "absolutely": 1.6,
+    "poco": 0.5, "algo": 0.7, "slightly": 0.5, "somewhat": 0.7, "bit": 0.6
+}
+
+CLAUSE_BREAKS = {".", "!", "?", ";", ",", "pero", "but", "aunque", "though"}
+
+# Tokens of lookahead a negator or intensifier keeps affecting.
+SCOPE = 3
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip accents so cue matching is accent-insensitive."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).replace("'", "")
+
+
+class LexiconScorer:
+    """Compiled weighted-lexicon sentiment scorer with negation and intensity handling."""
+
+    _TOKEN_RE = re.compile(r"[a-z0-9]+|[.!?;,\n]")
+
+    def __init__(self, terms: Optional[Dict[str, float]] = None):
+        merged = {**DEFAULT_TERMS, **(terms or {})}
+        self._exact: Dict[str, float] = {}
+        self._phrases: Dict[Tuple[str, ...], float] = {}
+        stems: List[Tuple[str, float]] = []
+        for raw, weight in merged.items():
+            term = fold(raw)
+            if term.endswith("*"):
+                stems.append((term[:-1], float(weight)))
+            elif " " in term:
+                self._phrases[tuple(term.split())] = float(weight)
+            else:
+                self._exact[term] = float(weight)
+        # Longest stem first so "odi*" does not shadow a more specific stem.
+        stems.sort(key=lambda item: len(item[0]), reverse=True)
+        self._stem_weights = {stem: weight for stem, weight in stems}
+        self._stem_re = re.compile("|".join(re.escape(stem) for stem, _ in stems)) if stems else None
+        self._max_phrase = max((len(p) for p in self._phrases), default=1)
+
+    def _term_weight(self, tokens: List[str], i: int) -> Tuple[float, int]:
+        """Weight of the cue starting at tokens[i] and how many tokens it spans."""
+        for size in range(min(self._max_phrase, len(tokens) - i), 1, -1):
+            weight = self._phrases.get(tuple(tokens[i:i + size]))
+            if weight is not None:
+                return weight, size
+        token = tokens[i]
+        weight = self._exact.get(token)
+        if weight is not None:
+            return weight, 1
+        if self._stem_re is not None:
+            match = self._stem_re.match(token)
+            if match:
+                return self._stem_weights[match.group(0)], 1
+        return 0.0, 1
+
+    def _score_tokens(self, tokens: List[str]) -> Tuple[float, float]:
+        total = 0.0
+        magnitude = 0.0
+        hits = 0
+        words = 0
+        negate_left = 0
+        boost = 1.0
+        boost_left = 0
+        exclaim = 0
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            if token in CLAUSE_BREAKS:
+                if token == "!":
+                    exclaim += 1
+                negate_left = 0
+                boost_left = 0
+                i += 1
+                continue
+            words += 1
+            if token in NEGATORS:
+                negate_left = SCOPE
+                i += 1
+                continue
+            if token in INTENSIFIERS:
+                boost = INTENSIFIERS[token]
+                boost_left = SCOPE
+                i += 1
+                continue
+            weight, span = self._term_weight(tokens, i)
+            if weight:
+                value = weight * (boost if boost_left > 0 else 1.0)
+                if negate_left > 0:
+                    # Negated praise reads as mild criticism; negated insults as mild approval.
+                    value = -value * 0.6
+                    negate_left = 0
+                total += value
+                magnitude += abs(value)
+                hits += 1
+                boost_left = 0
+            else:
+                negate_left = max(0, negate_left - 1)
+                boost_left = max(0, boost_left - 1)
+            i += span
+        if not hits:
+            # Short small talk without cues is confidently neutral; long cue-free text may be nuanced.
+            confidence = 0.6 if words <= 12 else 0.3
+        else:
+            agreement = abs(total) / magnitude if magnitude else 0.0
+            coverage = min(1.0, 0.45 + 0.25 * hits)
+            confidence = agreement * coverage
+        if hits and exclaim:
+            total *= 1.0 + 0.1 * min(exclaim, 3)
+        polarity = total / math.sqrt(total * total + 6.0) if total else 0.0
+        return round(polarity, 4), round(confidence, 4)
+
+    def score(self, text: str) -> Tuple[float, float]:
+        """Return ``(polarity, confidence)``; polarity is in [-1, 1], confidence in [0, 1]."""
+        return self.score_batch([text])[0]
+
+    def score_batch(self, texts: Iterable[str]) -> List[Tuple[float, float]]:
+        """Score many messages with one regex pass over the concatenated, folded text."""
+        items = [fold(t if isinstance(t, str) else "").replace("\n", " ") for t in texts]
+        if not items:
+            return []
+        starts: List[int] = []
+        offset = 0
+        for item in items:
+            starts.append(offset)
+            offset += len(item) + 1
+        buckets: List[List[str]] = [[] for _ in items]
+        for match in self._TOKEN_RE.finditer("\n".join(items)):
+            token = match.group(0)
+            if token == "\n":
+                continue
+            buckets[bisect_right(starts, match.start()) - 1].append(token)
+        return [self._score_tokens(tokens) for tokens in buckets]
+
+    @staticmethod
+    def to_deltas(polarity: float) -> Dict[str, int]:
+        return {
+            "affinityDelta": max(-2, min(2, int(round(polarity * 2)))),
+            "trustDelta": max(-2, min(2, int(round(polarity * 1.5)))),
+            "respectDelta": 0
+        }